@@ -0,0 +1,90 @@
+# admissao.py - CONTROLE DE ADMISSÃO (limite de requisições simultâneas)
+import threading
+import time
+
+
+class Recusada(Exception):
+    """A requisição não conseguiu vaga (fila cheia ou espera máxima estourada)"""
+
+    def __init__(self, classe, motivo):
+        super().__init__(f"{classe}: {motivo}")
+        self.classe = classe
+        self.motivo = motivo
+
+
+class Classe:
+    """
+    Vagas de uma classe de requisições (ex: leitura, escrita).
+
+    - limite: requisições atendidas ao mesmo tempo
+    - fila: quantas podem esperar por uma vaga; além disso são recusadas na hora
+    - espera: segundos máximos de espera na fila
+    """
+
+    def __init__(self, nome, limite, fila, espera):
+        self.nome = nome
+        self.limite = limite
+        self.fila = fila
+        self.espera = espera
+        self._cond = threading.Condition()
+        self._em_andamento = 0
+        self._na_fila = 0
+        self._stats = {"admitidas": 0, "recusadas_fila": 0, "recusadas_espera": 0}
+
+    def entrar(self):
+        with self._cond:
+            if self._em_andamento < self.limite and not self._na_fila:
+                self._em_andamento += 1
+                self._stats["admitidas"] += 1
+                return
+            if self._na_fila >= self.fila:
+                self._stats["recusadas_fila"] += 1
+                raise Recusada(self.nome, "fila cheia")
+
+            self._na_fila += 1
+            prazo = time.monotonic() + self.espera
+            try:
+                while self._em_andamento >= self.limite:
+                    restante = prazo - time.monotonic()
+                    if restante <= 0:
+                        self._stats["recusadas_espera"] += 1
+                        raise Recusada(self.nome, "tempo de espera esgotado")
+                    self._cond.wait(restante)
+            finally:
+                self._na_fila -= 1
+            self._em_andamento += 1
+            self._stats["admitidas"] += 1
+
+    def sair(self):
+        with self._cond:
+            self._em_andamento -= 1
+            self._cond.notify()
+
+    def estatisticas(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["em_andamento"] = self._em_andamento
+            stats["na_fila"] = self._na_fila
+        stats["limite"] = self.limite
+        return stats
+
+
+class ControleAdmissao:
+    """
+    Limita as requisições em andamento por classe, para que um banco lento
+    gere recusas rápidas (503) em vez de todas as threads presas esperando
+    conexão. Classes com limite <= 0 não são controladas.
+    """
+
+    def __init__(self, classes):
+        self._classes = {classe.nome: classe for classe in classes if classe.limite > 0}
+
+    def entrar(self, nome):
+        """Ocupa uma vaga (pode esperar na fila). Retorna a Classe a liberar depois, ou None"""
+        classe = self._classes.get(nome)
+        if classe is not None:
+            classe.entrar()
+        return classe
+
+    def estatisticas(self):
+        return {nome: classe.estatisticas() for nome, classe in self._classes.items()}
@@ -1,137 +1,1022 @@
 # Projeto final do curso de backend senai versao 3 "frankenstein"
-from flask import Flask, jsonify, request
-import mysql.connector
-from mysql.connector import Error, IntegrityError
+from flask import Flask, Response, g, has_request_context, jsonify, request, stream_with_context
+import base64
+import hashlib
+import json
+import logging
+import random
+import re
+import sqlite3
+from collections import Counter
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+import threading
+import time
+from mysql.connector import (DataError, Error, IntegrityError, InterfaceError,
+                             OperationalError, errorcode)
+from mysql.connector.constants import ClientFlag
+from admissao import Classe, ControleAdmissao, Recusada
 from app_config import Config
+from cache import CacheTTL
+from compressao import CompressorStream, comprimir, comprimivel, escolher_codificacao
+from db_pool import PoolConexoes, PoolEsgotado
+from eventos import FeedEventos
+from fila_ingestao import FilaIngestao
+from json_rapido import ProvedorJSONRapido
+from metricas import FASES, Metricas
+from migracoes import Migracao, migrar
+
+# Métricas do processo, expostas em /metrics
+metricas = Metricas()
+
+def registrar_fase(fase, segundos):
+    """Soma o tempo de uma fase (db_connect, db_query, json) na requisição atual"""
+    if has_request_context():
+        tempos = g.get('tempos_fase')
+        if tempos is not None:
+            tempos[FASES.index(fase)] += segundos
+
+class ProvedorJSONMedido(ProvedorJSONRapido):
+    """Provedor JSON rápido (orjson), medindo o tempo de serialização"""
+    
+    def codificar(self, obj, indentar=False):
+        inicio = time.perf_counter()
+        try:
+            return super().codificar(obj, indentar)
+        finally:
+            registrar_fase('json', time.perf_counter() - inicio)
 
 app = Flask(__name__)
 app.config.from_object(Config)
+app.json = ProvedorJSONMedido(app)
 
 # Constantes para validação
 STATUS_VALIDOS = ['aberto', 'em atendimento', 'concluido', 'cancelado']
 PRIORIDADES_VALIDAS = ['critica', 'alta', 'media', 'baixa']
 
+# Tamanhos das colunas de chamados (titulo VARCHAR(100), descricao TEXT em bytes)
+TITULO_MAX = 100
+DESCRICAO_MAX_BYTES = 65535
+
+# Ordem de exibição dos chamados (menor = mais urgente)
+ORDEM_PRIORIDADE = {'critica': 0, 'alta': 1, 'media': 2, 'baixa': 3}
+
+# Coluna gerada com a ordem numérica da prioridade, para o ORDER BY usar índice
+PRIORIDADE_RANK_SQL = (
+    "TINYINT AS (CASE prioridade "
+    + " ".join(f"WHEN '{p}' THEN {ordem}" for p, ordem in ORDEM_PRIORIDADE.items())
+    + " END) STORED"
+)
+
+# Índices compostos que cobrem a listagem e os filtros de GET /chamados
+# (cada um termina na ordem da listagem: rank ASC, data DESC, id DESC)
+INDICES_CHAMADOS = {
+    'idx_chamados_ordem': "prioridade_rank, data_abertura DESC, id_chamado DESC",
+    'idx_chamados_status_ordem': "status, prioridade_rank, data_abertura DESC, id_chamado DESC",
+    'idx_chamados_setor_ordem': "setor_id, prioridade_rank, data_abertura DESC, id_chamado DESC",
+    'idx_chamados_usuario_ordem': "usuario_id, prioridade_rank, data_abertura DESC, id_chamado DESC",
+    'idx_chamados_data': "data_abertura",
+}
+
+# Índice FULLTEXT da busca textual (GET /chamados/busca)
+INDICE_FULLTEXT_CHAMADOS = ('ft_chamados_texto', "titulo, descricao")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Cache das listas de setores e usuários (mudam pouco, são lidas o tempo todo).
+# Cada processo tem o seu: listar_referencia confere a versão da tabela antes de usar
+cache_referencia = CacheTTL(
+    ttl=app.config['CACHE_REFERENCIA_TTL'],
+    max_itens=app.config['CACHE_REFERENCIA_MAX']
+)
+
+def get_pool():
+    """Retorna o pool de conexões do processo, criando na primeira chamada"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolConexoes(
+                    {
+                        "host": app.config['MYSQL_HOST'],
+                        "user": app.config['MYSQL_USER'],
+                        "password": app.config['MYSQL_PASSWORD'],
+                        "database": app.config['MYSQL_DB'],
+                        "port": app.config['MYSQL_PORT'],
+                        # rowcount do UPDATE conta linhas encontradas, não só alteradas
+                        "client_flags": [ClientFlag.FOUND_ROWS],
+                    },
+                    tamanho=app.config['MYSQL_POOL_SIZE'],
+                    overflow=app.config['MYSQL_POOL_OVERFLOW'],
+                    timeout=app.config['MYSQL_POOL_TIMEOUT'],
+                    validar=app.config['MYSQL_POOL_VALIDAR'],
+                    ao_medir=registrar_fase,
+                    ao_concluir=registrar_consulta,
+                )
+    return _pool
+
 def get_db_connection():
-    """Cria conexão com o banco de dados"""
-    try:
-        connection = mysql.connector.connect(
-            host=app.config['MYSQL_HOST'],
-            user=app.config['MYSQL_USER'],
-            password=app.config['MYSQL_PASSWORD'],
-            database=app.config['MYSQL_DB'],
-            port=app.config['MYSQL_PORT']
-        )
-        if connection.is_connected():
-            return connection
+    """Empresta uma conexão do pool (close() devolve ao pool)"""
+    try:
+        return get_pool().obter()
     except Error as e:
         print(f"Erro ao conectar ao MySQL: {e}")
         return None
-    return None
+
+# ==================== LOG DE CONSULTAS LENTAS ====================
+log_consultas = logging.getLogger('servicedesk.consultas_lentas')
+if app.config['SLOW_QUERY_LOG']:
+    log_consultas.addHandler(logging.FileHandler(app.config['SLOW_QUERY_LOG'], encoding='utf-8'))
+else:
+    log_consultas.addHandler(logging.StreamHandler())
+log_consultas.setLevel(logging.INFO)
+log_consultas.propagate = False
+
+_ultimo_explain = {}  # sql normalizado -> momento do último EXPLAIN
+
+def normalizar_sql(sql):
+    """Junta espaços e listas de marcadores (IN (%s, %s, ...)) num formato estável"""
+    sql = " ".join(sql.split())
+    return re.sub(r"%s(\s*,\s*%s)+", "%s, ...", sql)
+
+def registrar_consulta(sql, parametros, segundos, linhas):
+    """Chamada pelo pool ao fim de cada comando; registra os que passaram do limite"""
+    if segundos * 1000 < app.config['SLOW_QUERY_MS']:
+        return
+    
+    normalizado = normalizar_sql(sql)
+    rota = request.url_rule.rule if has_request_context() and request.url_rule else None
+    log_consultas.warning(json.dumps({
+        "evento": "consulta_lenta",
+        "rota": rota,
+        "ms": round(segundos * 1000, 1),
+        "sql": normalizado,
+        "parametros": len(parametros) if parametros else 0,
+        "linhas": linhas,
+    }, ensure_ascii=False))
+    
+    # EXPLAIN só de SELECT/UPDATE/DELETE simples, por amostragem e no máximo
+    # uma vez por intervalo para cada comando, numa thread à parte
+    if not isinstance(parametros, (tuple, list, type(None))):
+        return
+    if normalizado.split(" ", 1)[0].upper() not in ('SELECT', 'UPDATE', 'DELETE'):
+        return
+    if random.random() >= app.config['SLOW_QUERY_EXPLAIN_AMOSTRA']:
+        return
+    agora = time.monotonic()
+    if agora - _ultimo_explain.get(normalizado, float('-inf')) < app.config['SLOW_QUERY_EXPLAIN_INTERVALO']:
+        return
+    _ultimo_explain[normalizado] = agora
+    threading.Thread(
+        target=capturar_explain,
+        args=(sql, parametros, normalizado, rota),
+        daemon=True
+    ).start()
+
+def capturar_explain(sql, parametros, normalizado, rota):
+    """Roda EXPLAIN do comando lento numa conexão própria e registra o plano"""
+    conexao = get_db_connection()
+    if not conexao:
+        return
+    cursor = None
+    try:
+        cursor = conexao.cursor(dictionary=True)
+        cursor.execute(f"EXPLAIN {sql}", parametros)
+        plano = cursor.fetchall()
+        log_consultas.warning(json.dumps({
+            "evento": "explain",
+            "rota": rota,
+            "sql": normalizado,
+            "plano": plano,
+        }, ensure_ascii=False, default=str))
+    except Error as e:
+        log_consultas.warning(json.dumps({"evento": "explain_falhou", "sql": normalizado, "erro": str(e)}))
+    finally:
+        if cursor:
+            cursor.close()
+        conexao.close()
 
 def init_db():
-    """Cria banco e tabelas se não existirem"""
+    """
+    Aplica as migrações pendentes. Com o banco já atualizado, a inicialização
+    custa uma conexão e um SELECT em schema_version.
+    """
     print("🔄 Inicializando banco de dados...")
     
     try:
-        # Conecta sem database primeiro
-        connection = mysql.connector.connect(
-            host=app.config['MYSQL_HOST'],
-            user=app.config['MYSQL_USER'],
-            password=app.config['MYSQL_PASSWORD'],
-            port=app.config['MYSQL_PORT']
+        antes, depois = migrar(
+            {
+                "host": app.config['MYSQL_HOST'],
+                "user": app.config['MYSQL_USER'],
+                "password": app.config['MYSQL_PASSWORD'],
+                "port": app.config['MYSQL_PORT'],
+            },
+            app.config['MYSQL_DB'],
+            MIGRACOES
         )
-        cursor = connection.cursor()
-        
-        # Cria database
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {app.config['MYSQL_DB']}")
-        cursor.execute(f"USE {app.config['MYSQL_DB']}")
-        
-        # Cria tabela de setores
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS setor (
-                id_setor INT AUTO_INCREMENT PRIMARY KEY,
-                nome VARCHAR(100) NOT NULL
-            )
-        """)
-        
-        # Cria tabela de usuários
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS usuario (
-                id_usuario INT AUTO_INCREMENT PRIMARY KEY,
-                nome VARCHAR(100) NOT NULL,
-                email VARCHAR(100) NOT NULL UNIQUE,
-                setor_id INT NOT NULL,
-                FOREIGN KEY (setor_id) REFERENCES setor(id_setor) 
-                ON DELETE RESTRICT ON UPDATE CASCADE
-            )
-        """)
-        
-        # Cria tabela de chamados
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS chamados (
-                id_chamado INT AUTO_INCREMENT PRIMARY KEY,
-                titulo VARCHAR(100) NOT NULL,
-                descricao TEXT,
-                prioridade ENUM('baixa','media','alta') NOT NULL,
-                status ENUM('aberto','em atendimento','concluido') NOT NULL DEFAULT 'aberto',
-                data_abertura TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                usuario_id INT NOT NULL,
-                setor_id INT NOT NULL,
-                FOREIGN KEY (usuario_id) REFERENCES usuario(id_usuario) 
-                ON DELETE RESTRICT ON UPDATE CASCADE,
-                FOREIGN KEY (setor_id) REFERENCES setor(id_setor) 
-                ON DELETE RESTRICT ON UPDATE CASCADE
-            )
-        """)
-        
-        connection.commit()
-        print("Banco de dados inicializado com sucesso!")
-        
+        if antes == depois:
+            print(f"Banco de dados na versão {depois}")
+        else:
+            print(f"Banco de dados migrado da versão {antes} para {depois}")
     except Error as e:
         print(f"Erro na inicialização: {e}")
-    finally:
-        if 'cursor' in locals() and cursor:
-            cursor.close()
-        if 'connection' in locals() and connection:
-            connection.close()
 
-# ==================== FUNÇÕES AUXILIARES ====================
-def setor_existe(setor_id):
+# ==================== MIGRAÇÕES ====================
+# Cada migração roda uma única vez por banco (tabela schema_version).
+# Nunca altere uma migração já publicada: crie a próxima versão.
+def migracao_inicial(cursor):
+    """
+    Tabelas criadas antes do controle de versões. Tudo é condicional
+    (IF NOT EXISTS e atualizar_schema_chamados) para adotar bancos
+    criados pelo init_db antigo em qualquer estágio.
+    """
+    # Cria tabela de setores
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS setor (
+            id_setor INT AUTO_INCREMENT PRIMARY KEY,
+            nome VARCHAR(100) NOT NULL
+        )
+    """)
+    
+    # Cria tabela de usuários
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS usuario (
+            id_usuario INT AUTO_INCREMENT PRIMARY KEY,
+            nome VARCHAR(100) NOT NULL,
+            email VARCHAR(100) NOT NULL UNIQUE,
+            setor_id INT NOT NULL,
+            FOREIGN KEY (setor_id) REFERENCES setor(id_setor) 
+            ON DELETE RESTRICT ON UPDATE CASCADE
+        )
+    """)
+    
+    # Cria tabela de chamados
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chamados (
+            id_chamado INT AUTO_INCREMENT PRIMARY KEY,
+            titulo VARCHAR(100) NOT NULL,
+            descricao TEXT,
+            prioridade ENUM('baixa','media','alta') NOT NULL,
+            status ENUM('aberto','em atendimento','concluido') NOT NULL DEFAULT 'aberto',
+            data_abertura TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            usuario_id INT NOT NULL,
+            setor_id INT NOT NULL,
+            prioridade_rank {PRIORIDADE_RANK_SQL},
+            {indices},
+            FOREIGN KEY (usuario_id) REFERENCES usuario(id_usuario) 
+            ON DELETE RESTRICT ON UPDATE CASCADE,
+            FOREIGN KEY (setor_id) REFERENCES setor(id_setor) 
+            ON DELETE RESTRICT ON UPDATE CASCADE
+        )
+    """.format(
+        PRIORIDADE_RANK_SQL=PRIORIDADE_RANK_SQL,
+        indices=",\n            ".join(
+            [f"INDEX {nome} ({colunas})" for nome, colunas in INDICES_CHAMADOS.items()]
+            + ["FULLTEXT INDEX {} ({})".format(*INDICE_FULLTEXT_CHAMADOS)]
+        )
+    ))
+    
+    # Bancos criados antes dos índices recebem o que estiver faltando
+    atualizar_schema_chamados(cursor)
+    
+    # Chamados concluídos antigos (mesmas colunas e índices, sem as FKs)
+    cursor.execute("CREATE TABLE IF NOT EXISTS chamados_arquivo LIKE chamados")
+    
+    # Contagens de chamados por status/prioridade/setor, mantidas a cada escrita
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chamados_estatisticas (
+            dimensao VARCHAR(20) NOT NULL,
+            valor VARCHAR(50) NOT NULL,
+            total INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimensao, valor)
+        )
+    """)
+    cursor.execute("SELECT EXISTS(SELECT 1 FROM chamados_estatisticas)")
+    if not cursor.fetchone()[0]:
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM chamados)")
+        if cursor.fetchone()[0]:
+            print("📈 Calculando estatísticas dos chamados existentes...")
+            reconstruir_estatisticas(cursor)
+    
+    # Eventos de criação/alteração/remoção, lidos pelo feed GET /chamados/stream
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chamados_eventos (
+            id_evento BIGINT AUTO_INCREMENT PRIMARY KEY,
+            tipo VARCHAR(20) NOT NULL,
+            id_chamado INT NOT NULL,
+            dados TEXT NOT NULL,
+            criado_em TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+            INDEX idx_eventos_criado_em (criado_em)
+        )
+    """)
+
+def migracao_enums_chamados(cursor):
+    """
+    Os ENUMs de chamados não tinham 'critica' e 'cancelado', aceitos pela API
+    (PRIORIDADES_VALIDAS / STATUS_VALIDOS). Os valores novos vão no fim da
+    lista, o que não renumera os existentes.
+    """
+    for tabela in ('chamados', 'chamados_arquivo'):
+        cursor.execute(f"""
+            ALTER TABLE {tabela}
+            MODIFY prioridade ENUM('baixa','media','alta','critica') NOT NULL,
+            MODIFY status ENUM('aberto','em atendimento','concluido','cancelado')
+                NOT NULL DEFAULT 'aberto'
+        """)
+
+def migracao_ingestao(cursor):
+    """
+    Id de rastreio -> id_chamado dos chamados gravados pela fila de ingestão.
+    Gravado na mesma transação do chamado: se o processo cair antes de marcar
+    o item como gravado na fila, a nova tentativa sabe que ele já existe.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chamados_ingestao (
+            id_rastreio CHAR(32) PRIMARY KEY,
+            id_chamado INT NOT NULL,
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_ingestao_criado_em (criado_em)
+        )
+    """)
+
+MIGRACOES = [
+    Migracao(1, "tabelas iniciais (setor, usuario, chamados e auxiliares)", migracao_inicial),
+    Migracao(2, "prioridade 'critica' e status 'cancelado' em chamados", migracao_enums_chamados),
+    Migracao(3, "chamados_ingestao (fila de ingestão assíncrona)", migracao_ingestao),
+]
+
+def atualizar_schema_chamados(cursor):
+    """
+    Leva uma tabela chamados antiga ao layout atual: adiciona a coluna
+    prioridade_rank e os índices de INDICES_CHAMADOS que não existirem.
+    Tudo vai num único ALTER TABLE para a tabela ser reconstruída uma vez só
+    (o índice FULLTEXT, se faltar, vem num ALTER próprio).
+    """
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'chamados'
+          AND COLUMN_NAME = 'prioridade_rank'
+    """)
+    tem_rank = cursor.fetchone()[0] > 0
+    
+    cursor.execute("""
+        SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'chamados'
+    """)
+    existentes = {linha[0] for linha in cursor.fetchall()}
+    
+    alteracoes = []
+    if not tem_rank:
+        alteracoes.append(f"ADD COLUMN prioridade_rank {PRIORIDADE_RANK_SQL}")
+    for nome, colunas in INDICES_CHAMADOS.items():
+        if nome not in existentes:
+            alteracoes.append(f"ADD INDEX {nome} ({colunas})")
+    
+    if alteracoes:
+        print(f"🔧 Atualizando tabela chamados ({len(alteracoes)} alterações)...")
+        cursor.execute(f"ALTER TABLE chamados {', '.join(alteracoes)}")
+    
+    # O InnoDB só cria um índice FULLTEXT por ALTER TABLE, então vai separado
+    nome, colunas = INDICE_FULLTEXT_CHAMADOS
+    if nome not in existentes:
+        print("🔧 Criando índice de busca textual em chamados...")
+        cursor.execute(f"ALTER TABLE chamados ADD FULLTEXT INDEX {nome} ({colunas})")
+
+# ==================== ESTATÍSTICAS ====================
+def deltas_chamado(status, prioridade, setor_id, sinal=1):
+    """Variações das contagens causadas por incluir (+1) ou remover (-1) um chamado"""
+    return Counter({
+        ('status', status): sinal,
+        ('prioridade', prioridade): sinal,
+        ('setor', str(setor_id)): sinal,
+    })
+
+def aplicar_estatisticas(cursor, deltas):
+    """
+    Soma as variações em chamados_estatisticas com um único INSERT ... ON DUPLICATE KEY.
+    Deve rodar na mesma transação da escrita no chamado.
+    As linhas vão sempre na mesma ordem (dimensao, valor): o InnoDB trava na ordem
+    do VALUES, e duas transações travando as mesmas linhas em ordens opostas
+    (aberto -> concluido e concluido -> aberto) entrariam em deadlock.
+    """
+    linhas = sorted(
+        (dimensao, valor, total) for (dimensao, valor), total in deltas.items() if total
+    )
+    if not linhas:
+        return
+    marcadores = ", ".join(["(%s, %s, %s)"] * len(linhas))
+    cursor.execute(
+        f"""INSERT INTO chamados_estatisticas (dimensao, valor, total) VALUES {marcadores}
+            ON DUPLICATE KEY UPDATE total = total + VALUES(total)""",
+        tuple(campo for linha in linhas for campo in linha)
+    )
+
+def reconstruir_estatisticas(cursor):
+    """
+    Recalcula chamados_estatisticas do zero a partir de chamados e chamados_arquivo
+    (arquivar um chamado não muda as contagens)
+    """
+    cursor.execute("DELETE FROM chamados_estatisticas")
+    cursor.execute("""
+        INSERT INTO chamados_estatisticas (dimensao, valor, total)
+        WITH todos AS (
+            SELECT status, prioridade, setor_id FROM chamados
+            UNION ALL
+            SELECT status, prioridade, setor_id FROM chamados_arquivo
+        )
+        SELECT 'status', status, COUNT(*) FROM todos GROUP BY status
+        UNION ALL
+        SELECT 'prioridade', prioridade, COUNT(*) FROM todos GROUP BY prioridade
+        UNION ALL
+        SELECT 'setor', setor_id, COUNT(*) FROM todos GROUP BY setor_id
+    """)
+
+@app.cli.command('reconstruir-estatisticas')
+def comando_reconstruir_estatisticas():
+    """Corrige divergências recalculando as estatísticas (flask --app app reconstruir-estatisticas)"""
     conexao = get_db_connection()
     if not conexao:
-        return False
+        print("❌ Falha na conexão com o banco")
+        return
+    cursor = None
     try:
         cursor = conexao.cursor()
-        cursor.execute("SELECT 1 FROM setor WHERE id_setor = %s", (setor_id,))
-        return cursor.fetchone() is not None
+        reconstruir_estatisticas(cursor)
+        conexao.commit()
+        print("✅ Estatísticas reconstruídas")
     finally:
-        cursor.close()
+        if cursor:
+            cursor.close()
         conexao.close()
 
-def usuario_existe(usuario_id):
-    conexao = get_db_connection()
-    if not conexao:
-        return False
+# ==================== EVENTOS ====================
+def registrar_eventos(cursor, eventos):
+    """
+    Grava eventos (tipo, id_chamado, dados) em chamados_eventos.
+    Deve rodar na mesma transação da escrita; depois do commit chame feed_eventos.notificar().
+    """
+    if eventos:
+        cursor.executemany(
+            "INSERT INTO chamados_eventos (tipo, id_chamado, dados) VALUES (%s, %s, %s)",
+            [(tipo, id_chamado, app.json.dumps({"id_chamado": id_chamado, **dados}))
+             for tipo, id_chamado, dados in eventos]
+        )
+
+def consultar_eventos(sql, parametros=()):
+    """Executa uma consulta em chamados_eventos fora de requisição (lança Error)"""
+    conexao = get_pool().obter()
+    cursor = None
     try:
         cursor = conexao.cursor()
-        cursor.execute("SELECT 1 FROM usuario WHERE id_usuario = %s", (usuario_id,))
-        return cursor.fetchone() is not None
+        cursor.execute(sql, parametros)
+        if not cursor.with_rows:
+            conexao.commit()
+            return []
+        return cursor.fetchall()
     finally:
-        cursor.close()
+        if cursor:
+            cursor.close()
         conexao.close()
 
-def chamado_existe(chamado_id):
-    conexao = get_db_connection()
-    if not conexao:
+def buscar_eventos(apos_id, limite):
+    return consultar_eventos(
+        """SELECT id_evento, tipo, dados, criado_em < NOW(3) - INTERVAL %s SECOND
+           FROM chamados_eventos WHERE id_evento > %s ORDER BY id_evento LIMIT %s""",
+        (app.config['EVENTOS_CARENCIA'], apos_id, limite)
+    )
+
+def limpar_eventos():
+    consultar_eventos(
+        "DELETE FROM chamados_eventos WHERE criado_em < NOW(3) - INTERVAL %s HOUR LIMIT 10000",
+        (app.config['EVENTOS_RETENCAO_HORAS'],)
+    )
+
+# A retenção roda numa thread própria: a do feed só sobe com o primeiro cliente
+# SSE, e sem ninguém acompanhando a fila a tabela cresceria para sempre
+feed_eventos = FeedEventos(
+    buscar_eventos,
+    lambda: consultar_eventos("SELECT COALESCE(MAX(id_evento), 0) FROM chamados_eventos")[0][0],
+    intervalo=app.config['EVENTOS_INTERVALO'],
+    capacidade=app.config['EVENTOS_BUFFER'],
+)
+
+# Segundos entre as limpezas de chamados_eventos
+INTERVALO_LIMPEZA_EVENTOS = 300
+
+_limpeza_eventos = None
+
+def tarefa_limpeza_eventos():
+    """Laço da thread de retenção: apaga os eventos com mais de EVENTOS_RETENCAO_HORAS"""
+    while True:
+        time.sleep(INTERVALO_LIMPEZA_EVENTOS)
+        try:
+            limpar_eventos()
+        except Error as e:
+            app.logger.warning("Limpeza de chamados_eventos falhou: %s", e)
+
+def iniciar_limpeza_eventos():
+    """Sobe a thread de retenção dos eventos do processo"""
+    global _limpeza_eventos
+    if _limpeza_eventos is None:
+        _limpeza_eventos = threading.Thread(
+            target=tarefa_limpeza_eventos, name='limpeza-eventos', daemon=True
+        )
+        _limpeza_eventos.start()
+
+# ==================== ARQUIVAMENTO ====================
+# Colunas copiadas para chamados_arquivo (prioridade_rank é gerada lá também)
+COLUNAS_CHAMADOS = "id_chamado, titulo, descricao, prioridade, status, data_abertura, usuario_id, setor_id"
+
+# Nome do lock (GET_LOCK) que impede dois processos de arquivar ao mesmo tempo
+LOCK_ARQUIVAMENTO = 'service_desk_arquivamento'
+
+_arquivamento = None
+
+def arquivar_chamados(conexao, idade_dias, tamanho_lote, max_lotes=None, pausa=0.0):
+    """
+    Move os chamados concluídos abertos há mais de idade_dias para chamados_arquivo.
+    Cada lote é uma transação curta (SELECT ... FOR UPDATE SKIP LOCKED, INSERT ... SELECT
+    e DELETE), com pausa entre os lotes para não disputar a tabela com a API.
+    Para após max_lotes lotes (None = até acabar). Retorna quantos chamados moveu.
+    """
+    movidos = lotes = 0
+    cursor = conexao.cursor()
+    try:
+        while max_lotes is None or lotes < max_lotes:
+            cursor.execute(
+                """SELECT id_chamado FROM chamados
+                   WHERE status = 'concluido' AND data_abertura < NOW() - INTERVAL %s DAY
+                   LIMIT %s FOR UPDATE SKIP LOCKED""",
+                (idade_dias, tamanho_lote)
+            )
+            ids = [linha[0] for linha in cursor.fetchall()]
+            if not ids:
+                conexao.commit()
+                break
+            
+            marcadores = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f"""INSERT INTO chamados_arquivo ({COLUNAS_CHAMADOS})
+                    SELECT {COLUNAS_CHAMADOS} FROM chamados WHERE id_chamado IN ({marcadores})""",
+                ids
+            )
+            cursor.execute(f"DELETE FROM chamados WHERE id_chamado IN ({marcadores})", ids)
+            conexao.commit()
+            
+            movidos += len(ids)
+            lotes += 1
+            if len(ids) < tamanho_lote:
+                break
+            if pausa:
+                time.sleep(pausa)
+    except Error:
+        conexao.rollback()
+        raise
+    finally:
+        cursor.close()
+    return movidos
+
+def restaurar_arquivado(cursor, chamado_id):
+    """
+    Devolve um chamado de chamados_arquivo para chamados (mesma transação de quem
+    chama; as estatísticas não mudam). Retorna False se ele não está arquivado.
+    """
+    cursor.execute(
+        "SELECT id_chamado FROM chamados_arquivo WHERE id_chamado = %s FOR UPDATE", (chamado_id,)
+    )
+    if cursor.fetchone() is None:
         return False
+    cursor.execute(
+        f"""INSERT INTO chamados ({COLUNAS_CHAMADOS})
+            SELECT {COLUNAS_CHAMADOS} FROM chamados_arquivo WHERE id_chamado = %s""",
+        (chamado_id,)
+    )
+    cursor.execute("DELETE FROM chamados_arquivo WHERE id_chamado = %s", (chamado_id,))
+    return True
+
+def executar_arquivamento(max_lotes=None):
+    """
+    Uma passada de arquivamento com as configurações ARQUIVO_*.
+    Retorna quantos chamados moveu, ou None se outro processo já está arquivando.
+    """
+    conexao = get_pool().obter()
+    cursor = None
     try:
         cursor = conexao.cursor()
-        cursor.execute("SELECT 1 FROM chamados WHERE id_chamado = %s", (chamado_id,))
-        return cursor.fetchone() is not None
+        cursor.execute("SELECT GET_LOCK(%s, 0)", (LOCK_ARQUIVAMENTO,))
+        if not cursor.fetchone()[0]:
+            return None
+        try:
+            return arquivar_chamados(
+                conexao,
+                app.config['ARQUIVO_IDADE_DIAS'],
+                app.config['ARQUIVO_LOTE'],
+                max_lotes=max_lotes,
+                pausa=app.config['ARQUIVO_PAUSA']
+            )
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_ARQUIVAMENTO,))
+            cursor.fetchone()
     finally:
-        cursor.close()
+        if cursor:
+            cursor.close()
         conexao.close()
 
+def tarefa_arquivamento():
+    """Laço da thread de arquivamento: uma passada limitada a cada ARQUIVO_INTERVALO segundos"""
+    while True:
+        time.sleep(app.config['ARQUIVO_INTERVALO'])
+        try:
+            movidos = executar_arquivamento(app.config['ARQUIVO_LOTES_POR_PASSADA'])
+            if movidos:
+                app.logger.info("Arquivamento: %s chamados movidos para chamados_arquivo", movidos)
+        except Error as e:
+            app.logger.warning("Arquivamento falhou: %s", e)
+
+def iniciar_arquivamento():
+    """Sobe a thread de arquivamento do processo (ARQUIVO_INTERVALO = 0 desliga)"""
+    global _arquivamento
+    if _arquivamento is None and app.config['ARQUIVO_INTERVALO'] > 0:
+        _arquivamento = threading.Thread(
+            target=tarefa_arquivamento, name='arquivamento', daemon=True
+        )
+        _arquivamento.start()
+
+@app.cli.command('arquivar-chamados')
+def comando_arquivar_chamados():
+    """Arquiva agora todos os chamados elegíveis (flask --app app arquivar-chamados)"""
+    try:
+        movidos = executar_arquivamento()
+    except Error as e:
+        print(f"❌ Erro no banco: {e}")
+        return
+    if movidos is None:
+        print("⚠️  Outro processo está arquivando agora; tente de novo mais tarde")
+    else:
+        print(f"✅ {movidos} chamados arquivados")
+
+# ==================== FUNÇÕES AUXILIARES ====================
+def fk_violada(erro):
+    """
+    Se o IntegrityError veio de uma FK inexistente (erro 1452),
+    retorna a coluna que falhou (ex: 'setor_id'). Senão retorna None.
+    Assim as rotas de escrita usam a própria FK no lugar de um SELECT prévio.
+    """
+    if erro.errno != errorcode.ER_NO_REFERENCED_ROW_2:
+        return None
+    encontrado = re.search(r"FOREIGN KEY \(`(\w+)`\)", erro.msg or "")
+    return encontrado.group(1) if encontrado else None
+
+def incluir_arquivo(args):
+    """?arquivo=1 inclui os chamados arquivados (chamados_arquivo) na consulta"""
+    return args.get('arquivo', '').strip().lower() in ('1', 'true', 'sim')
+
+def sql_chamados(select, where, ordem, ordem_uniao, limite=None, arquivo=False):
+    """
+    Monta a consulta de chamados sobre a tabela quente ou, com arquivo=True,
+    sobre ela e chamados_arquivo: cada tabela é ordenada e limitada no próprio
+    índice e só as duas fatias são juntadas e reordenadas (ordem_uniao usa os
+    nomes das colunas do SELECT). Com arquivo=True os parâmetros vão duas vezes.
+    """
+    limite_sql = f" LIMIT {int(limite)}" if limite is not None else ""
+    consulta = f"{select}\n{where}\nORDER BY {ordem}{limite_sql}"
+    if not arquivo:
+        return consulta
+    arquivada = consulta.replace("FROM chamados c", "FROM chamados_arquivo c", 1)
+    return f"({consulta})\nUNION ALL\n({arquivada})\nORDER BY {ordem_uniao}{limite_sql}"
+
+def codificar_cursor(chave):
+    """Gera o cursor opaco da próxima página a partir da chave de ordenação do último item"""
+    return base64.urlsafe_b64encode(json.dumps(chave).encode()).decode()
+
+def decodificar_cursor(cursor_texto, tipos):
+    """
+    Inverso de codificar_cursor. tipos converte cada posição da chave
+    (ex: (int, datetime.fromisoformat, int)). Lança ValueError se o cursor for inválido
+    """
+    try:
+        chave = json.loads(base64.urlsafe_b64decode(cursor_texto.encode()))
+        if len(chave) != len(tipos):
+            raise ValueError
+        return [tipo(valor) for tipo, valor in zip(tipos, chave)]
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+def ler_limite(args):
+    """Lê o parâmetro limit (padrão e máximo do Config). Lança ValueError se inválido"""
+    try:
+        limite = int(args.get('limit', app.config['CHAMADOS_LIMITE_PADRAO']))
+        if limite < 1:
+            raise ValueError
+    except ValueError:
+        raise ValueError("Parâmetro 'limit' deve ser um inteiro positivo")
+    return min(limite, app.config['CHAMADOS_LIMITE_MAXIMO'])
+
+def cabecalhos_proxima_pagina(resposta, proximo):
+    """Coloca o cursor da próxima página nos headers X-Next-Cursor e Link"""
+    resposta.headers['X-Next-Cursor'] = proximo
+    args = request.args.to_dict()
+    args['cursor'] = proximo
+    resposta.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+
+def filtros_chamados(args):
+    """
+    Monta o WHERE dos filtros de chamados a partir da query string.
+    Retorna (lista_de_condicoes, lista_de_parametros).
+    Lança ValueError com a mensagem de erro se algum filtro for inválido.
+    """
+    condicoes = []
+    parametros = []
+    
+    if 'status' in args:
+        status = args['status'].strip().lower()
+        if status not in STATUS_VALIDOS:
+            raise ValueError("Status inválido")
+        condicoes.append("c.status = %s")
+        parametros.append(status)
+    
+    if 'prioridade' in args:
+        prioridade = args['prioridade'].strip().lower()
+        if prioridade not in PRIORIDADES_VALIDAS:
+            raise ValueError("Prioridade inválida")
+        # Pela coluna gerada: os índices começam em prioridade_rank (ou status,
+        # prioridade_rank), então vira um range scan em vez de percorrer as outras prioridades
+        condicoes.append("c.prioridade_rank = %s")
+        parametros.append(ORDEM_PRIORIDADE[prioridade])
+    
+    for campo in ('setor_id', 'usuario_id'):
+        if campo in args:
+            try:
+                valor = int(args[campo])
+            except ValueError:
+                raise ValueError(f"Filtro '{campo}' deve ser um número inteiro")
+            condicoes.append(f"c.{campo} = %s")
+            parametros.append(valor)
+    
+    # data_inicio inclusiva; data_fim inclusiva (se só a data, vale o dia inteiro)
+    try:
+        if 'data_inicio' in args:
+            condicoes.append("c.data_abertura >= %s")
+            parametros.append(datetime.fromisoformat(args['data_inicio']))
+        if 'data_fim' in args:
+            data_fim = datetime.fromisoformat(args['data_fim'])
+            if len(args['data_fim']) == 10:
+                condicoes.append("c.data_abertura < %s")
+                parametros.append(data_fim + timedelta(days=1))
+            else:
+                condicoes.append("c.data_abertura <= %s")
+                parametros.append(data_fim)
+    except ValueError:
+        raise ValueError("Datas devem estar no formato ISO (AAAA-MM-DD ou AAAA-MM-DDTHH:MM:SS)")
+    
+    return condicoes, parametros
+
+def formato_streaming():
+    """
+    Modo streaming pedido pelo cliente: 'json', 'ndjson' ou None.
+    Ativado por ?stream=json|ndjson ou Accept: application/x-ndjson.
+    """
+    stream = request.args.get('stream', '').strip().lower()
+    if stream in ('json', 'ndjson'):
+        return stream
+    if request.accept_mimetypes.best == 'application/x-ndjson':
+        return 'ndjson'
+    return None
+
+def formato_colunar():
+    """
+    True se o cliente pediu ?format=columnar: {"colunas": [...], "linhas": [[...], ...]}
+    em vez de um objeto por linha. Lança ValueError para formatos desconhecidos.
+    """
+    formato = request.args.get('format', 'objetos').strip().lower()
+    if formato not in ('objetos', 'columnar'):
+        raise ValueError("Parâmetro 'format' deve ser 'objetos' ou 'columnar'")
+    return formato == 'columnar'
+
+def corpo_lista(cursor, linhas, colunar):
+    """Corpo de uma listagem: as próprias linhas (dicts) ou nomes das colunas + tuplas"""
+    if colunar:
+        return {"colunas": list(cursor.column_names), "linhas": linhas}
+    return linhas
+
+def resposta_streaming(sql, parametros, formato, colunar=False):
+    """
+    Executa a consulta num cursor não bufferizado e envia as linhas em lotes
+    (fetchmany) conforme são lidas, como array JSON ou NDJSON.
+    A memória fica constante e o primeiro byte sai antes do fim da consulta.
+    Com colunar=True as linhas vão como arrays: em JSON dentro de
+    {"colunas": [...], "linhas": [...]}, em NDJSON com os nomes na primeira linha.
+    """
+    conexao = get_db_connection()
+    if not conexao:
+        return jsonify({"erro": "Falha na conexão"}), 500
+    
+    cursor = None
+    try:
+        cursor = conexao.cursor(dictionary=not colunar)
+        cursor.execute(sql, parametros)
+    except Error as e:
+        if cursor:
+            cursor.close()
+        conexao.close()
+        return jsonify({"erro": str(e)}), 500
+    
+    lote = app.config['STREAM_LOTE']
+    
+    def gerar():
+        try:
+            primeiro = True
+            if colunar:
+                colunas = app.json.dumps(list(cursor.column_names))
+                yield colunas + '\n' if formato == 'ndjson' else f'{{"colunas":{colunas},"linhas":['
+            elif formato == 'json':
+                yield '['
+            while True:
+                linhas = cursor.fetchmany(lote)
+                if not linhas:
+                    break
+                partes = [app.json.dumps(linha) for linha in linhas]
+                if formato == 'ndjson':
+                    yield '\n'.join(partes) + '\n'
+                else:
+                    yield ('' if primeiro else ',') + ','.join(partes)
+                    primeiro = False
+            if formato == 'json':
+                yield ']}' if colunar else ']'
+        finally:
+            # Se o cliente desconectar no meio, sobram linhas não lidas:
+            # o pool descarta essa conexão em vez de reaproveitá-la
+            try:
+                cursor.close()
+            except Error:
+                pass
+            conexao.close()
+    
+    mimetype = 'application/x-ndjson' if formato == 'ndjson' else 'application/json'
+    return Response(stream_with_context(gerar()), mimetype=mimetype)
+
+def resposta_condicional(corpo, etag):
+    """Monta a resposta JSON com ETag; vira 304 se o cliente já tiver essa versão"""
+    resposta = app.response_class(corpo, mimetype='application/json')
+    resposta.set_etag(etag)
+    resposta.headers['Cache-Control'] = 'no-cache'
+    return resposta.make_conditional(request)
+
+def listar_referencia(grupo, sql, tabela, coluna_id):
+    """
+    GET de uma lista de referência (setores/usuários) com cache_referencia.
+    O cache é por processo: antes de usá-lo confere a versão da tabela no banco
+    (COUNT e MAX do id; as tabelas só recebem INSERT), assim um cadastro feito
+    por outro worker aparece na hora, sem esperar o TTL.
+    """
+    try:
+        colunar = formato_colunar()
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    formato = formato_streaming()
+    if formato:
+        return resposta_streaming(sql, (), formato, colunar)
+    
+    conexao = get_db_connection()
+    if not conexao:
+        return jsonify({"erro": "Falha na conexão"}), 500
+    
+    cursor = None
+    try:
+        cursor = conexao.cursor(dictionary=not colunar)
+        # Versão lida antes dos dados: se algo entrar no meio, a próxima requisição recarrega
+        cursor.execute(f"SELECT COUNT(*), COALESCE(MAX({coluna_id}), 0) FROM {tabela}")
+        linha = cursor.fetchone()
+        versao = tuple(linha.values()) if isinstance(linha, dict) else tuple(linha)
+        
+        chave = (grupo, request.query_string)
+        em_cache = cache_referencia.obter(chave)
+        if em_cache and em_cache[0] == versao:
+            return resposta_condicional(*em_cache[1:])
+        
+        cursor.execute(sql)
+        linhas = cursor.fetchall()
+        corpo = jsonify(corpo_lista(cursor, linhas, colunar)).get_data()
+        etag = hashlib.blake2b(corpo, digest_size=16).hexdigest()
+        cache_referencia.guardar(chave, (versao, corpo, etag))
+        return resposta_condicional(corpo, etag)
+    except Error as e:
+        return jsonify({"erro": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conexao:
+            conexao.close()
+
+# ==================== MÉTRICAS ====================
+@app.before_request
+def iniciar_medicao():
+    g.inicio_requisicao = time.perf_counter()
+    g.tempos_fase = [0.0] * len(FASES)
+
+@app.after_request
+def guardar_status(resposta):
+    g.status_resposta = resposta.status_code
+    return resposta
+
+@app.teardown_request
+def registrar_metricas(erro=None):
+    inicio = g.get('inicio_requisicao')
+    if inicio is None:
+        return
+    # Rotas inexistentes ficam agrupadas para não criar uma série por URL
+    rota = request.url_rule.rule if request.url_rule else 'desconhecida'
+    metricas.registrar(
+        rota,
+        request.method,
+        g.get('status_resposta', 500),
+        time.perf_counter() - inicio,
+        g.tempos_fase
+    )
+
+# ==================== CONTROLE DE ADMISSÃO ====================
+# Leituras e escritas têm vagas separadas: um pico de listagens não impede abrir chamados.
+# O feed SSE prende uma thread enquanto o cliente estiver conectado: tem classe
+# própria, sem fila, para os painéis abertos não tomarem as threads da API
+admissao = ControleAdmissao([
+    Classe('leitura', app.config['ADMISSAO_LEITURAS'],
+           app.config['ADMISSAO_FILA'], app.config['ADMISSAO_ESPERA']),
+    Classe('escrita', app.config['ADMISSAO_ESCRITAS'],
+           app.config['ADMISSAO_FILA'], app.config['ADMISSAO_ESPERA']),
+    Classe('stream', app.config['EVENTOS_MAX_CONEXOES'], 0, 0),
+])
+
+# Rotas fora do controle: monitoramento precisa responder justamente quando a API está saturada
+ROTAS_SEM_ADMISSAO = {'home', 'health_check', 'exportar_metricas'}
+
+# Rotas com classe própria (as demais são leitura ou escrita pelo método)
+CLASSE_POR_ROTA = {'stream_chamados': 'stream'}
+
+@app.before_request
+def admitir_requisicao():
+    if request.endpoint is None or request.endpoint in ROTAS_SEM_ADMISSAO:
+        return None
+    nome = CLASSE_POR_ROTA.get(request.endpoint)
+    if nome is None:
+        nome = 'leitura' if request.method in ('GET', 'HEAD') else 'escrita'
+    try:
+        g.classe_admissao = admissao.entrar(nome)
+    except Recusada as e:
+        resposta = jsonify({
+            "erro": "Servidor sobrecarregado, tente novamente em instantes",
+            "motivo": e.motivo
+        })
+        resposta.status_code = 503
+        resposta.headers['Retry-After'] = str(app.config['ADMISSAO_RETRY_AFTER'])
+        return resposta
+    return None
+
+@app.teardown_request
+def liberar_admissao(erro=None):
+    classe = g.pop('classe_admissao', None)
+    if classe is not None:
+        classe.sair()
+
+# ==================== COMPRESSÃO ====================
+@app.after_request
+def comprimir_resposta(resposta):
+    """
+    Comprime com brotli ou gzip conforme o Accept-Encoding do cliente.
+    Respostas bufferizadas só a partir de COMPRESSAO_MINIMO bytes; em streaming
+    o tamanho não é conhecido de antemão, então são sempre comprimidas.
+    """
+    if (resposta.status_code < 200 or resposta.status_code in (204, 304)
+            or 'Content-Encoding' in resposta.headers
+            or not comprimivel(resposta.mimetype)):
+        return resposta
+    
+    resposta.vary.add('Accept-Encoding')
+    codificacao = escolher_codificacao(request.accept_encodings)
+    if codificacao is None:
+        return resposta
+    
+    niveis = {
+        'nivel_gzip': app.config['COMPRESSAO_NIVEL_GZIP'],
+        'nivel_brotli': app.config['COMPRESSAO_NIVEL_BROTLI'],
+    }
+    if resposta.is_streamed:
+        resposta.response = CompressorStream(codificacao, **niveis).envolver(resposta.response)
+        resposta.headers.pop('Content-Length', None)
+    else:
+        corpo = resposta.get_data()
+        if len(corpo) < app.config['COMPRESSAO_MINIMO']:
+            return resposta
+        resposta.set_data(comprimir(corpo, codificacao, **niveis))
+    
+    resposta.headers['Content-Encoding'] = codificacao
+    # Mesmo conteúdo, bytes diferentes: a ETag vira fraca (If-None-Match continua valendo)
+    etag, fraca = resposta.get_etag()
+    if etag and not fraca:
+        resposta.set_etag(etag, weak=True)
+    return resposta
+
 # ==================== ROTAS DA API ====================
 @app.route('/')
 def home():
@@ -143,13 +1028,35 @@ def home():
             "setores": "/setor",
             "usuarios": "/usuario", 
             "chamados": "/chamados",
-            "saude": "/health"
+            "eventos": "/chamados/stream",
+            "saude": "/health",
+            "metricas": "/metrics"
         }
     })
+#================== métricas (get) ====================
+@app.route('/metrics', methods=['GET'])
+def exportar_metricas():
+    """Métricas do processo no formato texto do Prometheus"""
+    extras = {}
+    if _pool is not None:
+        for chave, valor in _pool.estatisticas().items():
+            extras[f"servicedesk_db_pool_{chave}"] = valor
+    for classe, stats in admissao.estatisticas().items():
+        for chave, valor in stats.items():
+            extras[f"servicedesk_admissao_{classe}_{chave}"] = valor
+    if _fila_ingestao is not None:
+        for estado, total in _fila_ingestao.estatisticas().items():
+            extras[f"servicedesk_fila_ingestao_{estado}"] = total
+    return Response(
+        metricas.exportar(extras),
+        mimetype='text/plain; version=0.0.4'
+    )
+
 #================== health check (get)====================
 @app.route('/health', methods=['GET'])
 def health_check():
     """Verificar saúde da API e do banco"""
+    conexao = None
     try:
         conexao = get_db_connection()
         if conexao and conexao.is_connected():
@@ -159,15 +1066,22 @@ def health_check():
                 "config": {
                     "host": app.config['MYSQL_HOST'],
                     "database": app.config['MYSQL_DB']
-                }
+                },
+                "pool": get_pool().estatisticas(),
+                "admissao": admissao.estatisticas()
             }), 200
         else:
             return jsonify({
                 "status": "online",
-                "database": "disconnected"
+                "database": "disconnected",
+                "pool": get_pool().estatisticas(),
+                "admissao": admissao.estatisticas()
             }), 503
     except Exception as e:
         return jsonify({"status": "error", "erro": str(e)}), 500
+    finally:
+        if conexao:
+            conexao.close()
 
 # ================== criar setor(post) =======================
 @app.route('/setor', methods=['POST'])
@@ -187,6 +1101,7 @@ def criar_setor():
         sql = "INSERT INTO setor (nome) VALUES (%s)"
         cursor.execute(sql, (dados['nome'],))
         conexao.commit()
+        cache_referencia.invalidar('setor')
         
         return jsonify({
             "mensagem": "Setor criado com sucesso",
@@ -203,23 +1118,8 @@ def criar_setor():
 #==================== listar setor(get)===============
 @app.route('/setor', methods=['GET'])
 def listar_setores():
-    conexao = get_db_connection()
-    if not conexao:
-        return jsonify({"erro": "Falha na conexão"}), 500
-    
-    cursor = None
-    try:
-        cursor = conexao.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM setor ORDER BY nome")
-        setores = cursor.fetchall()
-        return jsonify(setores), 200
-    except Error as e:
-        return jsonify({"erro": str(e)}), 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conexao:
-            conexao.close()
+    sql = "SELECT * FROM setor ORDER BY nome"
+    return listar_referencia('setor', sql, 'setor', 'id_setor')
 
 # ========================= criar usuario (post)===============
 @app.route('/usuario', methods=['POST'])
@@ -231,9 +1131,6 @@ def criar_usuario():
             "erro": "Campos obrigatórios: nome, email, setor_id"
         }), 400
     
-    if not setor_existe(dados['setor_id']):
-        return jsonify({"erro": "Setor informado não existe"}), 404
-    
     conexao = get_db_connection()
     if not conexao:
         return jsonify({"erro": "Falha na conexão"}), 500
@@ -251,13 +1148,16 @@ def criar_usuario():
             dados['setor_id']
         ))
         conexao.commit()
+        cache_referencia.invalidar('usuario')
         
         return jsonify({
             "mensagem": "Usuário criado com sucesso",
             "id_usuario": cursor.lastrowid
         }), 201
         
-    except IntegrityError:
+    except IntegrityError as e:
+        if fk_violada(e) == 'setor_id':
+            return jsonify({"erro": "Setor informado não existe"}), 404
         return jsonify({"erro": "Email já cadastrado"}), 409
     except Error as e:
         return jsonify({"erro": f"Erro no banco: {str(e)}"}), 500
@@ -269,58 +1169,241 @@ def criar_usuario():
 # ====================== listar usuario(get) ========================
 @app.route('/usuario', methods=['GET'])
 def listar_usuarios():
+    sql = """
+        SELECT 
+            u.id_usuario,
+            u.nome,
+            u.email,
+            s.nome AS setor,
+            u.setor_id
+        FROM usuario u
+        JOIN setor s ON u.setor_id = s.id_setor
+        ORDER BY u.nome
+    """
+    # Nomes de setor não mudam (setor só recebe INSERT): a versão de usuario basta
+    return listar_referencia('usuario', sql, 'usuario', 'id_usuario')
+
+# ===================== criar chamados(post) ==================
+SQL_INSERIR_CHAMADO = """
+    INSERT INTO chamados 
+    (titulo, descricao, prioridade, status, usuario_id, setor_id)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+def validar_chamado(dados):
+    """
+    Valida o payload de um chamado novo.
+    Retorna (corpo_do_erro, None) se inválido ou (None, linha) com os valores
+    normalizados na ordem do SQL_INSERIR_CHAMADO: (titulo, descricao, prioridade,
+    status, usuario_id, setor_id). Os ids saem como int: "3", "03" e 3.0 viram 3
+    (a chave das estatísticas por setor depende disso).
+    """
+    if not isinstance(dados, dict):
+        return {"erro": "Chamado deve ser um objeto JSON"}, None
+    
+    campos_obrigatorios = ['titulo', 'descricao', 'prioridade', 'usuario_id', 'setor_id']
+    
+    for campo in campos_obrigatorios:
+        if campo not in dados or not dados[campo]:
+            return {"erro": f"Campo '{campo}' é obrigatório"}, None
+    
+    for campo in ('titulo', 'descricao'):
+        if not isinstance(dados[campo], str):
+            return {"erro": f"Campo '{campo}' deve ser texto"}, None
+    if len(dados['titulo']) > TITULO_MAX:
+        return {"erro": f"Campo 'titulo' deve ter no máximo {TITULO_MAX} caracteres"}, None
+    if len(dados['descricao'].encode('utf-8')) > DESCRICAO_MAX_BYTES:
+        return {"erro": f"Campo 'descricao' deve ter no máximo {DESCRICAO_MAX_BYTES} bytes"}, None
+    
+    prioridade = str(dados['prioridade']).strip().lower()
+    if prioridade not in PRIORIDADES_VALIDAS:
+        return {
+            "erro": "Prioridade inválida",
+            "valores_permitidos": PRIORIDADES_VALIDAS
+        }, None
+    
+    ids = []
+    for campo in ('usuario_id', 'setor_id'):
+        valor = dados[campo]
+        try:
+            if isinstance(valor, bool) or (isinstance(valor, float) and not valor.is_integer()):
+                raise ValueError
+            ids.append(int(valor))
+        except (TypeError, ValueError):
+            return {"erro": "Campos 'usuario_id' e 'setor_id' devem ser inteiros"}, None
+    
+    return None, (dados['titulo'], dados['descricao'], prioridade, 'aberto', *ids)
+
+def modo_assincrono():
+    """?async=1 ou header Prefer: respond-async pedem a gravação pela fila de ingestão"""
+    if request.args.get('async', '').strip().lower() in ('1', 'true', 'sim'):
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '').lower()
+
+@app.route('/chamados', methods=['POST'])
+def criar_chamado():
+    """
+    Abre um chamado. No modo assíncrono (?async=1 ou Prefer: respond-async)
+    o chamado vai para a fila de ingestão e a resposta é 202 com um id de
+    rastreio, consultável em GET /chamados/ingestao/<id_rastreio>.
+    """
+    dados = request.json
+    
+    erro, linha = validar_chamado(dados)
+    if erro:
+        return jsonify(erro), 400
+    titulo, descricao, prioridade, status, usuario_id, setor_id = linha
+    
+    fila = get_fila_ingestao()
+    if fila is not None and modo_assincrono():
+        item = {
+            "titulo": titulo,
+            "descricao": descricao,
+            "prioridade": prioridade,
+            "usuario_id": usuario_id,
+            "setor_id": setor_id
+        }
+        try:
+            id_rastreio = fila.enfileirar(item)
+        except sqlite3.Error as e:
+            return jsonify({"erro": f"Erro na fila de ingestão: {str(e)}"}), 500
+        
+        resposta = jsonify({
+            "mensagem": "Chamado recebido; será gravado em instantes",
+            "id_rastreio": id_rastreio,
+            "status_inicial": "aberto"
+        })
+        resposta.headers['Location'] = f"/chamados/ingestao/{id_rastreio}"
+        return resposta, 202
+    
     conexao = get_db_connection()
     if not conexao:
         return jsonify({"erro": "Falha na conexão"}), 500
     
     cursor = None
     try:
-        cursor = conexao.cursor(dictionary=True)
-        sql = """
-            SELECT 
-                u.id_usuario,
-                u.nome,
-                u.email,
-                s.nome AS setor,
-                u.setor_id
-            FROM usuario u
-            JOIN setor s ON u.setor_id = s.id_setor
-            ORDER BY u.nome
-        """
-        cursor.execute(sql)
-        usuarios = cursor.fetchall()
-        return jsonify(usuarios), 200
+        cursor = conexao.cursor()
+        cursor.execute(SQL_INSERIR_CHAMADO, linha)
+        id_chamado = cursor.lastrowid
+        aplicar_estatisticas(cursor, deltas_chamado(status, prioridade, setor_id))
+        registrar_eventos(cursor, [('criado', id_chamado, {
+            "titulo": titulo,
+            "prioridade": prioridade,
+            "status": status,
+            "usuario_id": usuario_id,
+            "setor_id": setor_id
+        })])
+        
+        conexao.commit()
+        feed_eventos.notificar()
+        
+        return jsonify({
+            "mensagem": "Chamado criado com sucesso",
+            "id_chamado": id_chamado,
+            "status_inicial": "aberto"
+        }), 201
+        
+    except IntegrityError as e:
+        coluna = fk_violada(e)
+        if coluna == 'usuario_id':
+            return jsonify({"erro": "Usuário não encontrado"}), 404
+        if coluna == 'setor_id':
+            return jsonify({"erro": "Setor não encontrado"}), 404
+        return jsonify({"erro": f"Erro no banco: {str(e)}"}), 500
     except Error as e:
-        return jsonify({"erro": str(e)}), 500
+        return jsonify({"erro": f"Erro no banco: {str(e)}"}), 500
     finally:
         if cursor:
             cursor.close()
         if conexao:
             conexao.close()
 
-# ===================== criar chamados(post) ==================
-@app.route('/chamados', methods=['POST'])
-def criar_chamado():
-    dados = request.json
+# ===================== criar chamados em lote(post) ==================
+def ids_existentes(cursor, tabela, coluna, ids):
+    """Retorna o subconjunto de ids que existe na tabela (um único SELECT ... IN)"""
+    if not ids:
+        return set()
+    marcadores = ", ".join(["%s"] * len(ids))
+    cursor.execute(
+        f"SELECT {coluna} FROM {tabela} WHERE {coluna} IN ({marcadores})",
+        tuple(ids)
+    )
+    return {linha[0] for linha in cursor.fetchall()}
+
+def gravar_chamados(cursor, linhas):
+    """
+    Insere chamados já validados, linhas = [(titulo, descricao, prioridade, status,
+    usuario_id, setor_id), ...], com INSERT multi-linha; estatísticas e eventos vão
+    na mesma transação (o commit fica com quem chama). Retorna, na ordem das
+    linhas, o id_chamado criado ou a mensagem de erro (usuário/setor inexistente).
+    """
+    resultados = [None] * len(linhas)
     
-    campos_obrigatorios = ['titulo', 'descricao', 'prioridade', 'usuario_id', 'setor_id']
+    # Uma consulta por tabela para o lote inteiro
+    usuarios = ids_existentes(cursor, 'usuario', 'id_usuario', {linha[4] for linha in linhas})
+    setores = ids_existentes(cursor, 'setor', 'id_setor', {linha[5] for linha in linhas})
     
-    for campo in campos_obrigatorios:
-        if campo not in dados or not dados[campo]:
-            return jsonify({"erro": f"Campo '{campo}' é obrigatório"}), 400
+    inserir = []
+    for indice, linha in enumerate(linhas):
+        if linha[4] not in usuarios:
+            resultados[indice] = "Usuário não encontrado"
+        elif linha[5] not in setores:
+            resultados[indice] = "Setor não encontrado"
+        else:
+            inserir.append((indice, linha))
     
-    prioridade = dados['prioridade'].strip().lower()
-    if prioridade not in PRIORIDADES_VALIDAS:
+    # executemany vira um INSERT multi-linha; os ids de um INSERT simples
+    # são consecutivos a partir do lastrowid
+    tamanho_lote = app.config['CHAMADOS_BATCH_LOTE']
+    for inicio in range(0, len(inserir), tamanho_lote):
+        parte = inserir[inicio:inicio + tamanho_lote]
+        cursor.executemany(SQL_INSERIR_CHAMADO, [linha for _, linha in parte])
+        primeiro_id = cursor.lastrowid
+        for deslocamento, (indice, _) in enumerate(parte):
+            resultados[indice] = primeiro_id + deslocamento
+    
+    deltas = Counter()
+    for _, linha in inserir:
+        deltas.update(deltas_chamado(linha[3], linha[2], linha[5]))
+    aplicar_estatisticas(cursor, deltas)
+    registrar_eventos(cursor, [
+        ('criado', resultados[indice], {
+            "titulo": linha[0],
+            "prioridade": linha[2],
+            "status": linha[3],
+            "usuario_id": linha[4],
+            "setor_id": linha[5]
+        })
+        for indice, linha in inserir
+    ])
+    return resultados
+
+@app.route('/chamados/batch', methods=['POST'])
+def criar_chamados_lote():
+    """
+    Cria vários chamados de uma vez.
+    Corpo: lista de chamados (mesmo formato do POST /chamados) ou {"chamados": [...]}.
+    Responde com o resultado de cada item, na ordem enviada.
+    """
+    dados = request.json
+    if isinstance(dados, dict):
+        dados = dados.get('chamados')
+    if not isinstance(dados, list) or not dados:
+        return jsonify({"erro": "Envie uma lista de chamados"}), 400
+    if len(dados) > app.config['CHAMADOS_BATCH_MAX']:
         return jsonify({
-            "erro": "Prioridade inválida",
-            "valores_permitidos": PRIORIDADES_VALIDAS
-        }), 400
+            "erro": f"Máximo de {app.config['CHAMADOS_BATCH_MAX']} chamados por requisição"
+        }), 413
     
-    if not usuario_existe(dados['usuario_id']):
-        return jsonify({"erro": "Usuário não encontrado"}), 404
+    resultados = [None] * len(dados)
+    validos = []  # (indice, linha_para_insert)
     
-    if not setor_existe(dados['setor_id']):
-        return jsonify({"erro": "Setor não encontrado"}), 404
+    for indice, item in enumerate(dados):
+        erro, linha = validar_chamado(item)
+        if erro:
+            resultados[indice] = {"indice": indice, **erro}
+            continue
+        validos.append((indice, linha))
     
     conexao = get_db_connection()
     if not conexao:
@@ -329,72 +1412,394 @@ def criar_chamado():
     cursor = None
     try:
         cursor = conexao.cursor()
-        sql = """
-            INSERT INTO chamados 
-            (titulo, descricao, prioridade, status, usuario_id, setor_id)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """
         
-        cursor.execute(sql, (
-            dados['titulo'],
-            dados['descricao'],
-            prioridade,
-            'aberto',
-            dados['usuario_id'],
-            dados['setor_id']
-        ))
+        gravados = gravar_chamados(cursor, [linha for _, linha in validos])
+        for (indice, _), resultado in zip(validos, gravados):
+            if isinstance(resultado, int):
+                resultados[indice] = {"indice": indice, "id_chamado": resultado}
+            else:
+                resultados[indice] = {"indice": indice, "erro": resultado}
         
         conexao.commit()
-        
-        return jsonify({
-            "mensagem": "Chamado criado com sucesso",
-            "id_chamado": cursor.lastrowid,
-            "status_inicial": "aberto"
-        }), 201
+        feed_eventos.notificar()
         
     except Error as e:
+        conexao.rollback()
         return jsonify({"erro": f"Erro no banco: {str(e)}"}), 500
     finally:
         if cursor:
             cursor.close()
         if conexao:
             conexao.close()
+    
+    criados = sum(1 for r in resultados if 'id_chamado' in r)
+    if criados == len(resultados):
+        codigo = 201
+    elif criados:
+        codigo = 207
+    else:
+        codigo = 400
+    
+    return jsonify({
+        "criados": criados,
+        "erros": len(resultados) - criados,
+        "resultados": resultados
+    }), codigo
+
+# ===================== fila de ingestão ==================
+_fila_ingestao = None
+
+def gravar_lote_ingestao(itens):
+    """
+    Grava no MySQL um lote da fila de ingestão numa única transação (group commit).
+    Itens já gravados por uma tentativa anterior (chamados_ingestao) não são repetidos.
+    """
+    ids = [id_rastreio for id_rastreio, _ in itens]
+    conexao = get_pool().obter()
+    cursor = None
+    try:
+        cursor = conexao.cursor()
+        marcadores = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"SELECT id_rastreio, id_chamado FROM chamados_ingestao WHERE id_rastreio IN ({marcadores})",
+            tuple(ids)
+        )
+        resultados = {id_rastreio: (id_chamado, None) for id_rastreio, id_chamado in cursor.fetchall()}
+        
+        novos = [(id_rastreio, item) for id_rastreio, item in itens if id_rastreio not in resultados]
+        try:
+            mapeamento = gravar_itens_ingestao(cursor, novos, resultados)
+        except (DataError, IntegrityError):
+            # Um item com dado inválido derruba o INSERT multi-linha inteiro:
+            # refaz item a item (savepoint) e marca como erro só os ruins
+            conexao.rollback()
+            mapeamento = []
+            for id_rastreio, item in novos:
+                cursor.execute("SAVEPOINT item_ingestao")
+                try:
+                    mapeamento += gravar_itens_ingestao(cursor, [(id_rastreio, item)], resultados)
+                except (DataError, IntegrityError) as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT item_ingestao")
+                    resultados[id_rastreio] = (None, f"Erro no banco: {e.msg}")
+        conexao.commit()
+    except Error:
+        conexao.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        conexao.close()
+    
+    if mapeamento:
+        feed_eventos.notificar()
+    return resultados
+
+def gravar_itens_ingestao(cursor, itens, resultados):
+    """Grava os itens da fila e os vínculos em chamados_ingestao; retorna os vínculos criados"""
+    gravados = gravar_chamados(cursor, [
+        (item['titulo'], item['descricao'], item['prioridade'], 'aberto',
+         item['usuario_id'], item['setor_id'])
+        for _, item in itens
+    ])
+    mapeamento = []
+    for (id_rastreio, _), resultado in zip(itens, gravados):
+        if isinstance(resultado, int):
+            resultados[id_rastreio] = (resultado, None)
+            mapeamento.append((id_rastreio, resultado))
+        else:
+            resultados[id_rastreio] = (None, resultado)
+    if mapeamento:
+        cursor.executemany(
+            "INSERT INTO chamados_ingestao (id_rastreio, id_chamado) VALUES (%s, %s)",
+            mapeamento
+        )
+    return mapeamento
+
+def limpar_ingestao():
+    consultar_eventos(
+        "DELETE FROM chamados_ingestao WHERE criado_em < NOW() - INTERVAL %s HOUR LIMIT 10000",
+        (app.config['FILA_RETENCAO_HORAS'],)
+    )
+
+def get_fila_ingestao():
+    """Fila de ingestão do processo, criada na primeira chamada (None se FILA_INGESTAO vazio)"""
+    global _fila_ingestao
+    if _fila_ingestao is None and app.config['FILA_INGESTAO']:
+        with _pool_lock:
+            if _fila_ingestao is None:
+                _fila_ingestao = FilaIngestao(
+                    app.config['FILA_INGESTAO'],
+                    gravar_lote_ingestao,
+                    lote=app.config['FILA_LOTE'],
+                    intervalo=app.config['FILA_INTERVALO'],
+                    retencao_horas=app.config['FILA_RETENCAO_HORAS'],
+                    max_tentativas=app.config['FILA_MAX_TENTATIVAS'],
+                    # MySQL fora do ar ou sem conexão livre: espera sem gastar tentativas
+                    erros_transitorios=(InterfaceError, OperationalError, PoolEsgotado),
+                    limpar=limpar_ingestao,
+                )
+    return _fila_ingestao
+
+def iniciar_fila_ingestao():
+    """Sobe a thread da fila já no início, para gravar o que ficou de uma execução anterior"""
+    fila = get_fila_ingestao()
+    if fila is not None:
+        fila.iniciar()
+
+@app.route('/chamados/ingestao/<id_rastreio>', methods=['GET'])
+def status_ingestao(id_rastreio):
+    """Situação de um chamado enviado no modo assíncrono: pendente, gravado (com id_chamado) ou erro"""
+    fila = get_fila_ingestao()
+    if fila is None:
+        return jsonify({"erro": "Fila de ingestão desativada"}), 404
+    
+    try:
+        situacao = fila.consultar(id_rastreio)
+    except sqlite3.Error as e:
+        return jsonify({"erro": f"Erro na fila de ingestão: {str(e)}"}), 500
+    if situacao is not None:
+        corpo = {"id_rastreio": id_rastreio, "estado": situacao['estado']}
+        if situacao['estado'] == 'gravado':
+            corpo['id_chamado'] = situacao['id_chamado']
+        elif situacao['estado'] == 'erro':
+            corpo['erro'] = situacao['erro']
+        return jsonify(corpo), 200
+    
+    # Já saiu da fila local (retenção): o vínculo continua no MySQL
+    conexao = get_db_connection()
+    if not conexao:
+        return jsonify({"erro": "Falha na conexão"}), 500
+    
+    cursor = None
+    try:
+        cursor = conexao.cursor()
+        cursor.execute(
+            "SELECT id_chamado FROM chamados_ingestao WHERE id_rastreio = %s", (id_rastreio,)
+        )
+        linha = cursor.fetchone()
+        if linha is None:
+            return jsonify({"erro": "Id de rastreio não encontrado"}), 404
+        return jsonify({"id_rastreio": id_rastreio, "estado": "gravado", "id_chamado": linha[0]}), 200
+    except Error as e:
+        return jsonify({"erro": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conexao:
+            conexao.close()
+
 #==================== listar chamados(get)===================
+# Colunas devolvidas pelas rotas de leitura de chamados
+SQL_SELECT_CHAMADOS = """
+    SELECT 
+        c.id_chamado,
+        c.titulo,
+        c.descricao,
+        c.prioridade,
+        c.status,
+        c.data_abertura,
+        u.nome AS usuario,
+        s.nome AS setor,
+        u.id_usuario,
+        s.id_setor
+    FROM chamados c
+    JOIN usuario u ON c.usuario_id = u.id_usuario
+    JOIN setor s ON c.setor_id = s.id_setor
+"""
+
+# Ordem da listagem; ORDEM_CHAMADOS_UNIAO é a mesma ordem para o UNION com o arquivo
+ORDEM_CHAMADOS = "c.prioridade_rank, c.data_abertura DESC, c.id_chamado DESC"
+ORDEM_CHAMADOS_UNIAO = "FIELD(prioridade, {}), data_abertura DESC, id_chamado DESC".format(
+    ", ".join(f"'{p}'" for p in sorted(ORDEM_PRIORIDADE, key=ORDEM_PRIORIDADE.get))
+)
+
 @app.route('/chamados', methods=['GET'])
 def listar_chamados():
+    """
+    Lista chamados paginados por cursor (keyset).
+    Query string: limit, cursor, status, prioridade, setor_id, usuario_id,
+    data_inicio, data_fim, format, arquivo. O cursor da próxima página vem no header X-Next-Cursor.
+    Com ?stream=json|ndjson envia todas as linhas (a partir do cursor) em streaming.
+    Por padrão lê só os chamados ativos; ?arquivo=1 inclui os arquivados.
+    """
+    arquivo = incluir_arquivo(request.args)
+    try:
+        limite = ler_limite(request.args)
+        colunar = formato_colunar()
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    try:
+        condicoes, parametros = filtros_chamados(request.args)
+        if request.args.get('cursor'):
+            ordem, data, ultimo_id = decodificar_cursor(
+                request.args['cursor'], (int, datetime.fromisoformat, int)
+            )
+            # Continua logo após o último chamado da página anterior,
+            # respeitando a ordem (prioridade ASC, data DESC, id DESC)
+            # (o ">=" inicial dá ao otimizador o limite do range scan no índice)
+            condicoes.append("""c.prioridade_rank >= %s AND (
+                c.prioridade_rank > %s
+                OR (c.prioridade_rank = %s AND (
+                    c.data_abertura < %s
+                    OR (c.data_abertura = %s AND c.id_chamado < %s)
+                ))
+            )""")
+            parametros.extend([ordem, ordem, ordem, data, data, ultimo_id])
+    except ValueError as e:
+        return jsonify({
+            "erro": str(e),
+            "status_permitidos": STATUS_VALIDOS,
+            "prioridades_permitidas": PRIORIDADES_VALIDAS
+        }), 400
+    
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    parametros = tuple(parametros) * (2 if arquivo else 1)
+    
+    # Em streaming a resposta não tem tamanho de página: só limita se pedido
+    formato = formato_streaming()
+    if formato:
+        sql = sql_chamados(
+            SQL_SELECT_CHAMADOS, where, ORDEM_CHAMADOS, ORDEM_CHAMADOS_UNIAO,
+            limite if 'limit' in request.args else None, arquivo
+        )
+        return resposta_streaming(sql, parametros, formato, colunar)
+    
     conexao = get_db_connection()
     if not conexao:
         return jsonify({"erro": "Falha na conexão"}), 500
     
     cursor = None
     try:
-        cursor = conexao.cursor(dictionary=True)
-        sql = """
-            SELECT 
-                c.id_chamado,
-                c.titulo,
-                c.descricao,
-                c.prioridade,
-                c.status,
-                c.data_abertura,
-                u.nome AS usuario,
-                s.nome AS setor,
-                u.id_usuario,
-                s.id_setor
-            FROM chamados c
-            JOIN usuario u ON c.usuario_id = u.id_usuario
-            JOIN setor s ON c.setor_id = s.id_setor
-            ORDER BY 
-                CASE c.prioridade
-                    WHEN 'alta' THEN 1
-                    WHEN 'media' THEN 2
-                    WHEN 'baixa' THEN 3
-                END,
-                c.data_abertura DESC
-        """
-        cursor.execute(sql)
+        cursor = conexao.cursor(dictionary=not colunar)
+        # Busca um a mais só para saber se existe próxima página
+        cursor.execute(sql_chamados(
+            SQL_SELECT_CHAMADOS, where, ORDEM_CHAMADOS, ORDEM_CHAMADOS_UNIAO, limite + 1, arquivo
+        ), parametros)
         chamados = cursor.fetchall()
-        return jsonify(chamados), 200
+        
+        resposta = jsonify(corpo_lista(cursor, chamados[:limite], colunar))
+        if len(chamados) > limite:
+            ultimo = chamados[limite - 1]
+            if colunar:
+                ultimo = dict(zip(cursor.column_names, ultimo))
+            cabecalhos_proxima_pagina(resposta, codificar_cursor([
+                ORDEM_PRIORIDADE[ultimo['prioridade']],
+                ultimo['data_abertura'].isoformat(),
+                ultimo['id_chamado']
+            ]))
+        return resposta, 200
+    except Error as e:
+        return jsonify({"erro": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conexao:
+            conexao.close()
+#==================== busca textual (get) ===================
+@app.route('/chamados/busca', methods=['GET'])
+def buscar_chamados_texto():
+    """
+    Busca por texto em título e descrição (índice FULLTEXT), do mais relevante
+    para o menos (com ?arquivo=1, do mais recente para o mais antigo). Query string:
+    q (obrigatório), limit, cursor e os mesmos filtros de GET /chamados, além de
+    format e arquivo. Próxima página no header X-Next-Cursor.
+    """
+    termo = request.args.get('q', '').strip()
+    if not termo:
+        return jsonify({"erro": "Parâmetro 'q' é obrigatório"}), 400
+    
+    arquivo = incluir_arquivo(request.args)
+    match = "MATCH(c.titulo, c.descricao) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+    try:
+        limite = ler_limite(request.args)
+        colunar = formato_colunar()
+        condicoes, parametros = filtros_chamados(request.args)
+        condicoes.insert(0, match)
+        parametros.insert(0, termo)
+        if request.args.get('cursor') and arquivo:
+            data, ultimo_id = decodificar_cursor(
+                request.args['cursor'], (datetime.fromisoformat, int)
+            )
+            condicoes.append("(c.data_abertura < %s OR (c.data_abertura = %s AND c.id_chamado < %s))")
+            parametros.extend([data, data, ultimo_id])
+        elif request.args.get('cursor'):
+            relevancia, ultimo_id = decodificar_cursor(request.args['cursor'], (float, int))
+            condicoes.append(f"({match} < %s OR ({match} = %s AND c.id_chamado < %s))")
+            parametros.extend([termo, relevancia, termo, relevancia, ultimo_id])
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    conexao = get_db_connection()
+    if not conexao:
+        return jsonify({"erro": "Falha na conexão"}), 500
+    
+    cursor = None
+    try:
+        cursor = conexao.cursor(dictionary=not colunar)
+        sql = SQL_SELECT_CHAMADOS.replace(
+            "FROM chamados c", f", {match} AS relevancia\n    FROM chamados c", 1
+        )
+        # A relevância do FULLTEXT depende das estatísticas de cada tabela (IDF):
+        # a de um arquivado não se compara com a de um ativo, então com o arquivo
+        # a ordem é a data de abertura (a relevância continua no corpo, por tabela)
+        if arquivo:
+            ordem = ("c.data_abertura DESC, c.id_chamado DESC", "data_abertura DESC, id_chamado DESC")
+        else:
+            ordem = ("relevancia DESC, c.id_chamado DESC", "relevancia DESC, id_chamado DESC")
+        cursor.execute(
+            sql_chamados(
+                sql, f"WHERE {' AND '.join(condicoes)}", *ordem, limite + 1, arquivo
+            ),
+            (termo, *parametros) * (2 if arquivo else 1)
+        )
+        chamados = cursor.fetchall()
+        
+        resposta = jsonify(corpo_lista(cursor, chamados[:limite], colunar))
+        if len(chamados) > limite:
+            ultimo = chamados[limite - 1]
+            if colunar:
+                ultimo = dict(zip(cursor.column_names, ultimo))
+            if arquivo:
+                chave = [ultimo['data_abertura'].isoformat(), ultimo['id_chamado']]
+            else:
+                chave = [ultimo['relevancia'], ultimo['id_chamado']]
+            cabecalhos_proxima_pagina(resposta, codificar_cursor(chave))
+        return resposta, 200
+    except Error as e:
+        return jsonify({"erro": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conexao:
+            conexao.close()
+
+#==================== buscar chamado(get) ===================
+@app.route('/chamados/<int:chamado_id>', methods=['GET'])
+def buscar_chamado(chamado_id):
+    """
+    Um chamado pela chave primária, com nomes do usuário e do setor.
+    Com ?arquivo=1 procura também nos chamados arquivados.
+    """
+    conexao = get_db_connection()
+    if not conexao:
+        return jsonify({"erro": "Falha na conexão"}), 500
+    
+    cursor = None
+    try:
+        cursor = conexao.cursor(dictionary=True)
+        cursor.execute(f"{SQL_SELECT_CHAMADOS} WHERE c.id_chamado = %s", (chamado_id,))
+        chamado = cursor.fetchone()
+        if chamado is None and incluir_arquivo(request.args):
+            cursor.execute(
+                SQL_SELECT_CHAMADOS.replace("FROM chamados c", "FROM chamados_arquivo c", 1)
+                + " WHERE c.id_chamado = %s",
+                (chamado_id,)
+            )
+            chamado = cursor.fetchone()
+        if chamado is None:
+            return jsonify({"erro": "Chamado não encontrado"}), 404
+        return jsonify(chamado), 200
     except Error as e:
         return jsonify({"erro": str(e)}), 500
     finally:
@@ -403,11 +1808,40 @@ def listar_chamados():
         if conexao:
             conexao.close()
 #======================== atualizar chamados(put) =================
+def aplicar_atualizacao(cursor, chamado_id, campos, valores):
+    """
+    UPDATE do chamado, estatísticas e evento, sem commit.
+    Um chamado arquivado volta antes para a tabela ativa (se continuar
+    concluído, o arquivamento o leva de novo). Retorna False se o chamado não existe.
+    """
+    # Valores antigos (com lock) para ajustar as estatísticas na mesma transação
+    sql_antigo = "SELECT status, prioridade, setor_id FROM chamados WHERE id_chamado = %s FOR UPDATE"
+    cursor.execute(sql_antigo, (chamado_id,))
+    antigo = cursor.fetchone()
+    if antigo is None:
+        if not restaurar_arquivado(cursor, chamado_id):
+            return False
+        cursor.execute(sql_antigo, (chamado_id,))
+        antigo = cursor.fetchone()
+    
+    query = f"UPDATE chamados SET {', '.join(campos)} WHERE id_chamado = %s"
+    cursor.execute(query, tuple(valores) + (chamado_id,))
+    
+    novo = dict(antigo)
+    for campo, valor in zip(campos, valores):
+        novo[campo.replace(" = %s", "")] = valor
+    deltas = deltas_chamado(novo['status'], novo['prioridade'], novo['setor_id'])
+    deltas.subtract(deltas_chamado(antigo['status'], antigo['prioridade'], antigo['setor_id']))
+    aplicar_estatisticas(cursor, deltas)
+    registrar_eventos(cursor, [('atualizado', chamado_id, {
+        "status": novo['status'],
+        "prioridade": novo['prioridade'],
+        "campos_atualizados": [campo.replace(" = %s", "") for campo in campos]
+    })])
+    return True
+
 @app.route('/chamados/<int:chamado_id>', methods=['PUT'])
 def atualizar_chamado(chamado_id):
-    if not chamado_existe(chamado_id):
-        return jsonify({"erro": "Chamado não encontrado"}), 404
-    
     dados = request.json
     if not dados:
         return jsonify({"erro": "Nenhum dado enviado"}), 400
@@ -437,25 +1871,31 @@ def atualizar_chamado(chamado_id):
     if not campos:
         return jsonify({"erro": "Nenhum campo válido para atualizar"}), 400
     
-    valores.append(chamado_id)
-    
     conexao = get_db_connection()
     if not conexao:
         return jsonify({"erro": "Falha na conexão"}), 500
     
     cursor = None
     try:
-        cursor = conexao.cursor()
-        query = f"UPDATE chamados SET {', '.join(campos)} WHERE id_chamado = %s"
-        cursor.execute(query, tuple(valores))
-        conexao.commit()
-        
-        if cursor.rowcount == 0:
+        cursor = conexao.cursor(dictionary=True)
+        try:
+            encontrado = aplicar_atualizacao(cursor, chamado_id, campos, valores)
+        except Error as e:
+            if e.errno != errorcode.ER_LOCK_DEADLOCK:
+                raise
+            # Vítima de deadlock: o InnoDB já desfez a transação, tenta mais uma vez
+            conexao.rollback()
+            encontrado = aplicar_atualizacao(cursor, chamado_id, campos, valores)
+        if not encontrado:
             return jsonify({"erro": "Chamado não encontrado"}), 404
         
+        conexao.commit()
+        feed_eventos.notificar()
+        campos_atualizados = [campo.replace(" = %s", "") for campo in campos]
+        
         return jsonify({
             "mensagem": "Chamado atualizado com sucesso",
-            "campos_atualizados": [campo.replace(" = %s", "") for campo in campos]
+            "campos_atualizados": campos_atualizados
         }), 200
         
     except Error as e:
@@ -468,22 +1908,33 @@ def atualizar_chamado(chamado_id):
 #================== deletar chamados (delete)=================
 @app.route('/chamados/<int:chamado_id>', methods=['DELETE'])
 def deletar_chamado(chamado_id):
-    if not chamado_existe(chamado_id):
-        return jsonify({"erro": "Chamado não encontrado"}), 404
-    
     conexao = get_db_connection()
     if not conexao:
         return jsonify({"erro": "Falha na conexão"}), 500
     
     cursor = None
     try:
-        cursor = conexao.cursor()
-        cursor.execute("DELETE FROM chamados WHERE id_chamado = %s", (chamado_id,))
-        conexao.commit()
-        
-        if cursor.rowcount == 0:
+        cursor = conexao.cursor(dictionary=True)
+        # Procura na tabela ativa e depois no arquivo
+        for tabela in ('chamados', 'chamados_arquivo'):
+            cursor.execute(
+                f"SELECT status, prioridade, setor_id FROM {tabela} WHERE id_chamado = %s FOR UPDATE",
+                (chamado_id,)
+            )
+            antigo = cursor.fetchone()
+            if antigo is not None:
+                break
+        else:
             return jsonify({"erro": "Chamado não encontrado"}), 404
         
+        cursor.execute(f"DELETE FROM {tabela} WHERE id_chamado = %s", (chamado_id,))
+        aplicar_estatisticas(cursor, deltas_chamado(
+            antigo['status'], antigo['prioridade'], antigo['setor_id'], sinal=-1
+        ))
+        registrar_eventos(cursor, [('removido', chamado_id, {})])
+        conexao.commit()
+        feed_eventos.notificar()
+        
         return jsonify({"mensagem": "Chamado deletado com sucesso"}), 200
     except Error as e:
         return jsonify({"erro": f"Erro no banco: {str(e)}"}), 500
@@ -493,15 +1944,158 @@ def deletar_chamado(chamado_id):
         if conexao:
             conexao.close()
 
+#================== feed de eventos (get, SSE e polling) =================
+def eventos_apos(ultimo, espera):
+    """
+    Eventos com id > ultimo, esperando até espera segundos se ainda não houver.
+    Vêm do buffer do feed ou, se o cliente estiver mais atrasado que ele, do banco.
+    Retorna (eventos, novo_ultimo).
+    """
+    while True:
+        eventos = feed_eventos.aguardar(ultimo, espera)
+        if eventos is not None:
+            return eventos, (eventos[-1][0] if eventos else ultimo)
+        # Cliente mais atrasado que o buffer em memória: lê o que perdeu do banco
+        ate = feed_eventos.ultimo
+        eventos = [
+            (id_evento, tipo, dados) for id_evento, tipo, dados, _ in
+            buscar_eventos(ultimo, FeedEventos.LIMITE_CONSULTA)
+            if id_evento <= ate
+        ]
+        if eventos:
+            return eventos, eventos[-1][0]
+        # Os eventos desse intervalo já saíram da retenção
+        ultimo = ate
+
+@app.route('/chamados/eventos', methods=['GET'])
+def eventos_chamados():
+    """
+    Feed de eventos por polling: os eventos com id > ?desde=, na hora (ou esperando
+    até ?espera= segundos, no máximo EVENTOS_ESPERA_MAX, se não houver nenhum).
+    Sem desde, responde só o ultimo_id de onde começar. Diferente do SSE, não prende
+    uma thread entre as consultas: é o modo para muitos atendentes acompanharem a fila.
+    """
+    try:
+        desde = request.args.get('desde')
+        apos = int(desde) if desde else None
+        espera = min(float(request.args.get('espera', 0)), app.config['EVENTOS_ESPERA_MAX'])
+    except ValueError:
+        return jsonify({"erro": "Parâmetros 'desde' e 'espera' devem ser números"}), 400
+    
+    try:
+        feed_eventos.iniciar()
+        if apos is None:
+            return jsonify({"eventos": [], "ultimo_id": feed_eventos.ultimo}), 200
+        eventos, ultimo = eventos_apos(apos, max(espera, 0))
+    except Error as e:
+        return jsonify({"erro": str(e)}), 500
+    
+    return jsonify({
+        "eventos": [
+            {"id": id_evento, "tipo": tipo, "dados": json.loads(dados)}
+            for id_evento, tipo, dados in eventos
+        ],
+        "ultimo_id": ultimo
+    }), 200
+
+@app.route('/chamados/stream', methods=['GET'])
+def stream_chamados():
+    """
+    Feed de eventos dos chamados em Server-Sent Events: criado, atualizado, removido.
+    Para retomar de onde parou, envie o último id recebido no header Last-Event-ID
+    (o EventSource do navegador faz isso sozinho) ou em ?desde=. Sem ele,
+    só chegam os eventos a partir da conexão. Cada conexão ocupa uma thread:
+    limitado a EVENTOS_MAX_CONEXOES por processo (para muitos clientes, use /chamados/eventos).
+    """
+    desde = request.headers.get('Last-Event-ID') or request.args.get('desde')
+    try:
+        apos = int(desde) if desde else None
+    except ValueError:
+        return jsonify({"erro": "Last-Event-ID/desde deve ser um número inteiro"}), 400
+    
+    try:
+        feed_eventos.iniciar()
+    except Error as e:
+        return jsonify({"erro": str(e)}), 500
+    if apos is None:
+        apos = feed_eventos.ultimo
+    
+    heartbeat = app.config['EVENTOS_HEARTBEAT']
+    
+    def gerar():
+        ultimo = apos
+        yield "retry: 3000\n\n"
+        while True:
+            eventos, ultimo = eventos_apos(ultimo, heartbeat)
+            if not eventos:
+                # Comentário SSE: mantém a conexão viva atrás de proxies
+                yield ": ping\n\n"
+                continue
+            yield "".join(
+                f"id: {id_evento}\nevent: {tipo}\ndata: {dados}\n\n"
+                for id_evento, tipo, dados in eventos
+            )
+    
+    return Response(
+        stream_with_context(gerar()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+#================== estatísticas de chamados (get) =================
+@app.route('/chamados/estatisticas', methods=['GET'])
+def estatisticas_chamados():
+    """Contagens por status, prioridade e setor (lidas do resumo, não dos chamados)"""
+    conexao = get_db_connection()
+    if not conexao:
+        return jsonify({"erro": "Falha na conexão"}), 500
+    
+    cursor = None
+    try:
+        cursor = conexao.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT e.dimensao, e.valor, e.total, s.nome AS setor
+            FROM chamados_estatisticas e
+            LEFT JOIN setor s ON e.dimensao = 'setor' AND s.id_setor = e.valor
+            WHERE e.total <> 0
+        """)
+        
+        resultado = {"total": 0, "por_status": {}, "por_prioridade": {}, "por_setor": []}
+        for linha in cursor.fetchall():
+            if linha['dimensao'] == 'status':
+                resultado['por_status'][linha['valor']] = linha['total']
+                resultado['total'] += linha['total']
+            elif linha['dimensao'] == 'prioridade':
+                resultado['por_prioridade'][linha['valor']] = linha['total']
+            else:
+                resultado['por_setor'].append({
+                    "id_setor": int(linha['valor']),
+                    "setor": linha['setor'],
+                    "total": linha['total']
+                })
+        resultado['por_setor'].sort(key=lambda item: item['id_setor'])
+        return jsonify(resultado), 200
+    except Error as e:
+        return jsonify({"erro": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if conexao:
+            conexao.close()
+
 # ==================== INICIALIZAÇÃO (smp no final""""") ====================
 if __name__ == '__main__':
+    # Servidor de desenvolvimento; em produção use: python servidor.py
     init_db()
-    print(f"🚀 Servidor iniciando em: http://{app.config['MYSQL_HOST']}:5000")
+    iniciar_arquivamento()
+    iniciar_limpeza_eventos()
+    iniciar_fila_ingestao()
+    print(f"🚀 Servidor iniciando em: http://{app.config['API_HOST']}:{app.config['API_PORT']}")
     print(f"📊 Banco de dados: {app.config['MYSQL_DB']}")
     app.run(
         debug=app.config['DEBUG'],
-        host='0.0.0.0',
-        port=5000,
+        host=app.config['API_HOST'],
+        port=app.config['API_PORT'],
         use_reloader=False
     )
 
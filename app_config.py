@@ -14,10 +14,95 @@ class Config:
     MYSQL_DB = os.getenv("MYSQL_DB", "service_desk")
     MYSQL_PORT = int(os.getenv("MYSQL_PORT", "3306"))
     
+    # Pool de conexões MySQL
+    MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "5"))
+    MYSQL_POOL_OVERFLOW = int(os.getenv("MYSQL_POOL_OVERFLOW", "10"))
+    MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "5"))
+    MYSQL_POOL_VALIDAR = os.getenv("MYSQL_POOL_VALIDAR", "True").lower() == "true"
+    
     # Configurações da aplicação
     DEBUG = os.getenv("DEBUG", "True").lower() == "true"
     SECRET_KEY = os.getenv("SECRET_KEY", "chave_secreta_padrao_para_desenvolvimento")
     
+    # Servidor de produção (servidor.py): processos do gunicorn, threads por processo
+    # e segundos para terminar as requisições em andamento ao reiniciar
+    WEB_WORKERS = int(os.getenv("WEB_WORKERS", "4"))
+    WEB_THREADS = int(os.getenv("WEB_THREADS", "16"))
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+    
+    # Controle de admissão: requisições simultâneas por processo (0 = sem limite),
+    # quantas esperam na fila e por quantos segundos antes do 503 com Retry-After.
+    # Quem espera na fila também ocupa uma thread do gunicorn, então mantenha
+    # ADMISSAO_LEITURAS + ADMISSAO_ESCRITAS + EVENTOS_MAX_CONEXOES + 2 * ADMISSAO_FILA < WEB_THREADS
+    # (senão a fila do próprio gunicorn enche antes e o 503 nunca sai; o servidor.py avisa)
+    # e ADMISSAO_LEITURAS + ADMISSAO_ESCRITAS <= MYSQL_POOL_SIZE + MYSQL_POOL_OVERFLOW
+    ADMISSAO_LEITURAS = int(os.getenv("ADMISSAO_LEITURAS", "7"))
+    ADMISSAO_ESCRITAS = int(os.getenv("ADMISSAO_ESCRITAS", "4"))
+    ADMISSAO_FILA = int(os.getenv("ADMISSAO_FILA", "1"))
+    ADMISSAO_ESPERA = float(os.getenv("ADMISSAO_ESPERA", "2"))
+    ADMISSAO_RETRY_AFTER = int(os.getenv("ADMISSAO_RETRY_AFTER", "1"))
+    
+    # Log de consultas lentas: limite em ms, fração das lentas que recebem EXPLAIN,
+    # intervalo mínimo (s) entre EXPLAINs do mesmo comando e arquivo (vazio = stderr)
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+    SLOW_QUERY_EXPLAIN_AMOSTRA = float(os.getenv("SLOW_QUERY_EXPLAIN_AMOSTRA", "0.1"))
+    SLOW_QUERY_EXPLAIN_INTERVALO = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVALO", "300"))
+    SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "")
+    
+    # Paginação de GET /chamados
+    CHAMADOS_LIMITE_PADRAO = int(os.getenv("CHAMADOS_LIMITE_PADRAO", "100"))
+    CHAMADOS_LIMITE_MAXIMO = int(os.getenv("CHAMADOS_LIMITE_MAXIMO", "1000"))
+    
+    # Linhas lidas do banco por lote nas respostas em streaming (?stream=json|ndjson)
+    STREAM_LOTE = int(os.getenv("STREAM_LOTE", "500"))
+    
+    # POST /chamados/batch: itens por requisição / linhas por INSERT multi-linha
+    CHAMADOS_BATCH_MAX = int(os.getenv("CHAMADOS_BATCH_MAX", "5000"))
+    CHAMADOS_BATCH_LOTE = int(os.getenv("CHAMADOS_BATCH_LOTE", "1000"))
+    
+    # Cache de GET /setor e GET /usuario (segundos / número de respostas guardadas)
+    CACHE_REFERENCIA_TTL = int(os.getenv("CACHE_REFERENCIA_TTL", "60"))
+    CACHE_REFERENCIA_MAX = int(os.getenv("CACHE_REFERENCIA_MAX", "128"))
+    
+    # Feed de eventos (GET /chamados/stream e /chamados/eventos): segundos entre
+    # consultas ao banco, eventos em memória para reconexões, intervalo do comentário de keep-alive,
+    # carência (s) para ids fora de ordem, retenção da tabela chamados_eventos,
+    # conexões SSE simultâneas por processo (além disso 503; 0 = sem limite) e
+    # espera máxima (s) de GET /chamados/eventos?espera=.
+    # Cada conexão SSE (e cada polling esperando) ocupa uma thread: mantenha
+    # EVENTOS_MAX_CONEXOES pequeno; atendentes em massa usam o polling sem espera
+    EVENTOS_INTERVALO = float(os.getenv("EVENTOS_INTERVALO", "1"))
+    EVENTOS_BUFFER = int(os.getenv("EVENTOS_BUFFER", "1000"))
+    EVENTOS_HEARTBEAT = float(os.getenv("EVENTOS_HEARTBEAT", "15"))
+    EVENTOS_CARENCIA = float(os.getenv("EVENTOS_CARENCIA", "5"))
+    EVENTOS_RETENCAO_HORAS = int(os.getenv("EVENTOS_RETENCAO_HORAS", "24"))
+    EVENTOS_MAX_CONEXOES = int(os.getenv("EVENTOS_MAX_CONEXOES", "2"))
+    EVENTOS_ESPERA_MAX = float(os.getenv("EVENTOS_ESPERA_MAX", "5"))
+    
+    # Arquivamento: chamados concluídos abertos há mais de ARQUIVO_IDADE_DIAS dias vão
+    # para chamados_arquivo a cada ARQUIVO_INTERVALO segundos (0 = desligado), em até
+    # ARQUIVO_LOTES_POR_PASSADA lotes de ARQUIVO_LOTE linhas, com ARQUIVO_PAUSA s entre eles
+    ARQUIVO_IDADE_DIAS = int(os.getenv("ARQUIVO_IDADE_DIAS", "90"))
+    ARQUIVO_INTERVALO = float(os.getenv("ARQUIVO_INTERVALO", "3600"))
+    ARQUIVO_LOTE = int(os.getenv("ARQUIVO_LOTE", "500"))
+    ARQUIVO_LOTES_POR_PASSADA = int(os.getenv("ARQUIVO_LOTES_POR_PASSADA", "20"))
+    ARQUIVO_PAUSA = float(os.getenv("ARQUIVO_PAUSA", "0.5"))
+    
+    # Fila de ingestão (POST /chamados?async=1): arquivo SQLite (vazio = desligada),
+    # chamados gravados por transação no MySQL, segundos entre verificações da fila,
+    # horas que o id de rastreio continua consultável e tentativas antes de desistir do item
+    FILA_INGESTAO = os.getenv("FILA_INGESTAO", "fila_ingestao.db")
+    FILA_LOTE = int(os.getenv("FILA_LOTE", "500"))
+    FILA_INTERVALO = float(os.getenv("FILA_INTERVALO", "0.2"))
+    FILA_RETENCAO_HORAS = int(os.getenv("FILA_RETENCAO_HORAS", "24"))
+    FILA_MAX_TENTATIVAS = int(os.getenv("FILA_MAX_TENTATIVAS", "5"))
+    
+    # Compressão das respostas (gzip, ou brotli se o pacote estiver instalado):
+    # tamanho mínimo em bytes das respostas bufferizadas e nível de cada algoritmo
+    COMPRESSAO_MINIMO = int(os.getenv("COMPRESSAO_MINIMO", "1024"))
+    COMPRESSAO_NIVEL_GZIP = int(os.getenv("COMPRESSAO_NIVEL_GZIP", "6"))
+    COMPRESSAO_NIVEL_BROTLI = int(os.getenv("COMPRESSAO_NIVEL_BROTLI", "4"))
+    
     # Configurações da API
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = int(os.getenv("API_PORT", "5000"))
\ No newline at end of file
@@ -0,0 +1,361 @@
+# benchmark.py - CARGA E BENCHMARK DA API
+#
+# 1) Popular um banco local (use um MYSQL_DB só para benchmark!):
+#      python benchmark.py semear --chamados 100k --usuarios 2k --setores 20 --limpar
+#
+# 2) Com a API rodando, repetir os fluxos do menu.py em paralelo:
+#      ARQUIVO_INTERVALO=0 python servidor.py
+#      python benchmark.py executar --operacoes 5000 --concorrencia 16 --saida bench.json
+#    (as datas semeadas são antigas: com o arquivamento ligado, os concluídos
+#     sairiam de chamados no meio das medições e os resultados variariam)
+#
+# O resultado (JSON) traz vazão e latência p50/p95/p99 por rota, para
+# comparar entre commits (ex: diff de dois arquivos --saida).
+import argparse
+import json
+import math
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import requests
+
+# Fluxos do menu.py e o peso padrão de cada um na mistura
+MIX_PADRAO = {
+    'listar': 50,
+    'criar': 20,
+    'atualizar': 15,
+    'deletar': 5,
+    'criar_usuario': 10,
+}
+
+
+def quantidade(texto):
+    """Aceita 10000, 10k ou 1M"""
+    texto = texto.strip().lower()
+    multiplicador = {'k': 1_000, 'm': 1_000_000}.get(texto[-1:], 1)
+    return int(float(texto.rstrip('km')) * multiplicador)
+
+
+def ler_mix(texto):
+    """'listar=50,criar=20' -> {'listar': 50, 'criar': 20}"""
+    mix = {}
+    for parte in texto.split(','):
+        nome, peso = parte.split('=')
+        if nome.strip() not in MIX_PADRAO:
+            raise argparse.ArgumentTypeError(f"Fluxo desconhecido: {nome}")
+        mix[nome.strip()] = int(peso)
+    return mix
+
+
+# ==================== SEMEAR ====================
+# Fim do intervalo das datas de abertura: fixo para a mesma --semente gerar
+# sempre o mesmo banco (com datetime.now() as datas mudariam a cada execução)
+FIM_DATAS_PADRAO = '2025-01-01'
+
+
+def semear(args):
+    from mysql.connector import IntegrityError
+
+    from app import app, get_db_connection, init_db, reconstruir_estatisticas
+
+    if app.config['ARQUIVO_INTERVALO'] > 0:
+        print("⚠️  ARQUIVO_INTERVALO > 0: os chamados semeados têm mais de "
+              f"{app.config['ARQUIVO_IDADE_DIAS']} dias e o servidor vai arquivar os concluídos "
+              "durante o benchmark. Rode a API com ARQUIVO_INTERVALO=0")
+
+    init_db()
+    conexao = get_db_connection()
+    if not conexao:
+        print("❌ Falha na conexão com o banco")
+        return 1
+
+    aleatorio = random.Random(args.semente)
+    lote = args.lote
+    cursor = conexao.cursor()
+    inicio = time.perf_counter()
+    try:
+        if args.limpar:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            for tabela in ('chamados_estatisticas', 'chamados_eventos', 'chamados_arquivo',
+                           'chamados_ingestao', 'chamados', 'usuario', 'setor'):
+                cursor.execute(f"TRUNCATE TABLE {tabela}")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        else:
+            # Confere antes de gravar qualquer coisa: sem isso os setores ficariam
+            # no banco e só os usuários (email único) falhariam
+            cursor.execute(
+                "SELECT 1 FROM usuario WHERE email LIKE %s LIMIT 1",
+                (f"bench{args.semente}\\_%@exemplo.com",)
+            )
+            if cursor.fetchone():
+                print(f"❌ O banco já tem os dados da --semente {args.semente}. "
+                      f"Use --limpar ou outra --semente")
+                return 1
+
+        # Setores e usuários numa transação só (commit junto com os usuários)
+        def inserir(sql, linhas):
+            ids = []
+            for i in range(0, len(linhas), lote):
+                cursor.executemany(sql, linhas[i:i + lote])
+                ids.extend(range(cursor.lastrowid, cursor.lastrowid + len(linhas[i:i + lote])))
+            return ids
+
+        setores = inserir(
+            "INSERT INTO setor (nome) VALUES (%s)",
+            [(f"Setor {n}",) for n in range(args.setores)]
+        )
+        usuarios = inserir(
+            "INSERT INTO usuario (nome, email, setor_id) VALUES (%s, %s, %s)",
+            [(f"Usuario {n}", f"bench{args.semente}_{n}@exemplo.com", aleatorio.choice(setores))
+             for n in range(args.usuarios)]
+        )
+        conexao.commit()
+
+        # Chamados em blocos para não montar milhões de tuplas na memória
+        fim_datas = datetime.fromisoformat(args.ate)
+        sql = """
+            INSERT INTO chamados
+            (titulo, descricao, prioridade, status, data_abertura, usuario_id, setor_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        for inicio_bloco in range(0, args.chamados, lote):
+            linhas = []
+            for n in range(inicio_bloco, min(inicio_bloco + lote, args.chamados)):
+                linhas.append((
+                    f"Chamado {n}",
+                    f"Descrição do chamado de benchmark {n} " * aleatorio.randint(1, 8),
+                    aleatorio.choice(['baixa', 'media', 'alta']),
+                    aleatorio.choice(['aberto', 'em atendimento', 'concluido']),
+                    fim_datas - timedelta(seconds=aleatorio.randint(0, 365 * 24 * 3600)),
+                    aleatorio.choice(usuarios),
+                    aleatorio.choice(setores),
+                ))
+            cursor.executemany(sql, linhas)
+            conexao.commit()
+
+        reconstruir_estatisticas(cursor)
+        conexao.commit()
+    except IntegrityError as e:
+        conexao.rollback()
+        print(f"❌ Dados de uma semeadura anterior já estão no banco ({e.msg}). "
+              f"Use --limpar ou outra --semente")
+        return 1
+    finally:
+        cursor.close()
+        conexao.close()
+
+    duracao = time.perf_counter() - inicio
+    print(f"✅ Semeados {args.setores} setores, {args.usuarios} usuários e "
+          f"{args.chamados} chamados em {duracao:.1f}s")
+    return 0
+
+
+# ==================== EXECUTAR ====================
+class Cliente:
+    """Um usuário simulado: sessão HTTP própria e registro das latências"""
+
+    def __init__(self, base_url, numero, semente, resultados, lock):
+        self.base_url = base_url
+        self.numero = numero
+        self.sessao = requests.Session()
+        self.aleatorio = random.Random(semente * 1000 + numero)
+        self.resultados = resultados
+        self.lock = lock
+        self.criados = []  # chamados deste cliente, candidatos a deletar
+        self.conhecidos = []  # ids existentes, candidatos a atualizar
+        self.contador = 0
+
+    def chamar(self, metodo, rota, url, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            resposta = self.sessao.request(metodo, self.base_url + url, timeout=30, **kwargs)
+            ok = resposta.status_code < 400
+        except requests.RequestException:
+            resposta, ok = None, False
+        duracao = time.perf_counter() - inicio
+        with self.lock:
+            self.resultados[f"{metodo} {rota}"].append((duracao, ok))
+        return resposta if ok else None
+
+    def json(self, metodo, rota, url, **kwargs):
+        resposta = self.chamar(metodo, rota, url, **kwargs)
+        return resposta.json() if resposta is not None else None
+
+    # Fluxos equivalentes aos do menu.py
+    def listar(self):
+        self.chamar("GET", "/chamados", "/chamados")
+
+    def criar(self):
+        usuarios = self.json("GET", "/usuario", "/usuario")
+        setores = self.json("GET", "/setor", "/setor")
+        if not usuarios or not setores:
+            return
+        resposta = self.json("POST", "/chamados", "/chamados", json={
+            "titulo": "Chamado de benchmark",
+            "descricao": "Criado pelo benchmark.py",
+            "prioridade": self.aleatorio.choice(['baixa', 'media', 'alta']),
+            "usuario_id": self.aleatorio.choice(usuarios)['id_usuario'],
+            "setor_id": self.aleatorio.choice(setores)['id_setor'],
+        })
+        if resposta:
+            self.criados.append(resposta['id_chamado'])
+
+    def atualizar(self):
+        # O menu.py confere o chamado com GET /chamados/<id> antes do PUT;
+        # os ids vêm da primeira página da listagem (lida uma vez por cliente)
+        if not self.conhecidos:
+            self.conhecidos = [c['id_chamado'] for c in self.json("GET", "/chamados", "/chamados") or []]
+            if not self.conhecidos:
+                return
+        chamado_id = self.aleatorio.choice(self.conhecidos)
+        if self.chamar("GET", "/chamados/<id>", f"/chamados/{chamado_id}") is None:
+            return
+        self.chamar("PUT", "/chamados/<id>", f"/chamados/{chamado_id}", json={
+            "status": self.aleatorio.choice(['aberto', 'em atendimento', 'concluido'])
+        })
+
+    def deletar(self):
+        if not self.criados:
+            return self.criar()
+        chamado_id = self.criados.pop()
+        if self.chamar("GET", "/chamados/<id>", f"/chamados/{chamado_id}") is None:
+            return
+        self.chamar("DELETE", "/chamados/<id>", f"/chamados/{chamado_id}")
+
+    def criar_usuario(self):
+        setores = self.json("GET", "/setor", "/setor")
+        if not setores:
+            return
+        self.contador += 1
+        self.json("POST", "/usuario", "/usuario", json={
+            "nome": "Usuário de benchmark",
+            "email": f"bench_{time.time_ns()}_{self.numero}_{self.contador}@exemplo.com",
+            "setor_id": self.aleatorio.choice(setores)['id_setor'],
+        })
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    # Método nearest-rank
+    indice = max(0, math.ceil(p / 100 * len(valores_ordenados)) - 1)
+    return valores_ordenados[indice]
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(args):
+    resultados = defaultdict(list)
+    lock = threading.Lock()
+    fluxos = list(args.mix)
+    pesos = [args.mix[f] for f in fluxos]
+
+    # Cada cliente recebe uma fatia fixa das operações: mesma semente = mesma carga
+    por_cliente = [args.operacoes // args.concorrencia] * args.concorrencia
+    for i in range(args.operacoes % args.concorrencia):
+        por_cliente[i] += 1
+
+    def trabalhar(numero, total):
+        cliente = Cliente(args.url, numero, args.semente, resultados, lock)
+        for _ in range(total):
+            getattr(cliente, cliente.aleatorio.choices(fluxos, pesos)[0])()
+
+    threads = [
+        threading.Thread(target=trabalhar, args=(n, total))
+        for n, total in enumerate(por_cliente)
+    ]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracao = time.perf_counter() - inicio
+
+    rotas = {}
+    total_requisicoes = total_erros = 0
+    for rota, medidas in sorted(resultados.items()):
+        latencias = sorted(d for d, _ in medidas)
+        erros = sum(1 for _, ok in medidas if not ok)
+        total_requisicoes += len(medidas)
+        total_erros += erros
+        rotas[rota] = {
+            "requisicoes": len(medidas),
+            "erros": erros,
+            "rps": round(len(medidas) / duracao, 1),
+            "media_ms": round(sum(latencias) / len(latencias) * 1000, 2),
+            "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+            "p95_ms": round(percentil(latencias, 95) * 1000, 2),
+            "p99_ms": round(percentil(latencias, 99) * 1000, 2),
+        }
+
+    relatorio = {
+        "commit": commit_atual(),
+        "config": {
+            "url": args.url,
+            "operacoes": args.operacoes,
+            "concorrencia": args.concorrencia,
+            "semente": args.semente,
+            "mix": args.mix,
+        },
+        "total": {
+            "requisicoes": total_requisicoes,
+            "erros": total_erros,
+            "duracao_s": round(duracao, 2),
+            "rps": round(total_requisicoes / duracao, 1) if duracao else 0.0,
+        },
+        "rotas": rotas,
+    }
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False, sort_keys=True)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    print(texto)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da API Service Desk")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_semear = sub.add_parser('semear', help="popula o banco configurado no .env")
+    p_semear.add_argument('--chamados', type=quantidade, default=quantidade('10k'))
+    p_semear.add_argument('--usuarios', type=quantidade, default=1000)
+    p_semear.add_argument('--setores', type=quantidade, default=20)
+    p_semear.add_argument('--lote', type=int, default=5000, help="linhas por INSERT")
+    p_semear.add_argument('--semente', type=int, default=42)
+    p_semear.add_argument('--ate', default=FIM_DATAS_PADRAO,
+                          help="data ISO da abertura mais recente; as outras vão até 1 ano antes "
+                               f"(padrão: {FIM_DATAS_PADRAO}). Datas antigas são arquivadas pelo "
+                               "servidor se ARQUIVO_INTERVALO > 0")
+    p_semear.add_argument('--limpar', action='store_true',
+                          help="apaga setores, usuários e chamados antes (TRUNCATE)")
+
+    p_exec = sub.add_parser('executar', help="repete os fluxos do menu.py contra a API")
+    p_exec.add_argument('--url', default="http://127.0.0.1:5000")
+    p_exec.add_argument('--operacoes', type=quantidade, default=2000, help="fluxos a executar")
+    p_exec.add_argument('--concorrencia', type=int, default=8, help="clientes simultâneos")
+    p_exec.add_argument('--mix', type=ler_mix, default=MIX_PADRAO,
+                        help="pesos dos fluxos, ex: listar=50,criar=20,atualizar=15,deletar=5,criar_usuario=10")
+    p_exec.add_argument('--semente', type=int, default=42)
+    p_exec.add_argument('--saida', help="grava o relatório JSON neste arquivo")
+
+    args = parser.parse_args()
+    return semear(args) if args.comando == 'semear' else executar(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
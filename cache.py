@@ -0,0 +1,48 @@
+# cache.py - CACHE EM MEMÓRIA COM TTL
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheTTL:
+    """
+    Cache LRU com tempo de vida por item, seguro entre threads.
+
+    As chaves são tuplas cujo primeiro elemento é o grupo (ex: 'setor'),
+    para que invalidar('setor') apague todas as variações daquela rota.
+    """
+
+    def __init__(self, ttl=60, max_itens=128):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        """Retorna o valor guardado ou None se não existir/estiver expirado"""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            expira_em, valor = item
+            if expira_em < time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return valor
+
+    def guardar(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, grupo=None):
+        """Remove os itens do grupo informado (ou tudo, se grupo for None)"""
+        with self._lock:
+            if grupo is None:
+                self._itens.clear()
+                return
+            for chave in [c for c in self._itens if c[0] == grupo]:
+                del self._itens[chave]
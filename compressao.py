@@ -0,0 +1,83 @@
+# compressao.py - COMPRESSÃO DAS RESPOSTAS (gzip / brotli)
+import gzip
+import zlib
+
+# brotli é opcional: sem o pacote instalado a API oferece só gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Tipos que valem a pena comprimir (JSON, NDJSON e texto)
+TIPOS_COMPRIMIVEIS = ('application/json', 'application/x-ndjson', 'text/')
+
+# Server-Sent Events ficam de fora: mensagens pequenas e esparsas, que
+# precisam chegar na hora (e alguns proxies seguram SSE comprimido)
+TIPOS_NAO_COMPRIMIVEIS = ('text/event-stream',)
+
+
+def comprimivel(mimetype):
+    return (bool(mimetype) and mimetype.startswith(TIPOS_COMPRIMIVEIS)
+            and mimetype not in TIPOS_NAO_COMPRIMIVEIS)
+
+
+def escolher_codificacao(aceitas):
+    """
+    Escolhe a codificação a partir do Accept-Encoding do cliente
+    (objeto Accept do Werkzeug). Prefere brotli se estiver instalado.
+    Retorna 'br', 'gzip' ou None.
+    """
+    if brotli is not None and aceitas.quality('br') > 0:
+        return 'br'
+    if aceitas.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def comprimir(dados, codificacao, nivel_gzip=6, nivel_brotli=4):
+    """Comprime um corpo inteiro (respostas bufferizadas)"""
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=nivel_brotli)
+    return gzip.compress(dados, compresslevel=nivel_gzip)
+
+
+class CompressorStream:
+    """
+    Compressão incremental para respostas em streaming.
+    Cada parte é comprimida e descarregada (flush) na hora, para o cliente
+    continuar recebendo os dados conforme o banco os entrega.
+    """
+
+    def __init__(self, codificacao, nivel_gzip=6, nivel_brotli=4):
+        self.codificacao = codificacao
+        if codificacao == 'br':
+            self._compressor = brotli.Compressor(quality=nivel_brotli)
+        else:
+            # wbits=31: formato gzip (cabeçalho + CRC), não zlib puro
+            self._compressor = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 31)
+
+    def comprimir(self, dados):
+        if self.codificacao == 'br':
+            return self._compressor.process(dados) + self._compressor.flush()
+        return self._compressor.compress(dados) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self):
+        if self.codificacao == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+    def envolver(self, partes):
+        """Gera as partes comprimidas de um iterável de str/bytes"""
+        try:
+            for parte in partes:
+                if isinstance(parte, str):
+                    parte = parte.encode('utf-8')
+                if parte:
+                    yield self.comprimir(parte)
+            yield self.finalizar()
+        finally:
+            # Repassa o close() (cliente desconectou) para o gerador original,
+            # que é quem devolve a conexão ao pool
+            fechar = getattr(partes, 'close', None)
+            if fechar is not None:
+                fechar()
@@ -0,0 +1,270 @@
+# db_pool.py - POOL DE CONEXÕES MYSQL
+import queue
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+
+class PoolEsgotado(Error):
+    """Nenhuma conexão ficou livre dentro do tempo de espera"""
+
+
+class CursorMedido:
+    """
+    Envolve um cursor e mede o tempo gasto em execute/fetch*.
+    Cada medição é enviada para ao_medir('db_query', segundos).
+
+    Se ao_concluir for informado, cada comando é acompanhado do execute até
+    o próximo execute (ou close), somando o tempo dos fetch* e as linhas lidas,
+    e no fim chama ao_concluir(sql, parametros, segundos, linhas).
+    """
+
+    def __init__(self, cursor, ao_medir, ao_concluir=None):
+        self._cursor = cursor
+        self._ao_medir = ao_medir
+        self._ao_concluir = ao_concluir
+        self._sql = None
+        self._parametros = None
+        self._segundos = 0.0
+        self._linhas = 0
+
+    def _medir(self, metodo, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            segundos = time.perf_counter() - inicio
+            self._segundos += segundos
+            if self._ao_medir is not None:
+                self._ao_medir('db_query', segundos)
+
+    def _iniciar(self, sql, parametros):
+        self._concluir()
+        self._sql = sql
+        self._parametros = parametros
+        self._segundos = 0.0
+        self._linhas = 0
+
+    def _concluir(self):
+        if self._sql is None or self._ao_concluir is None:
+            self._sql = None
+            return
+        sql, self._sql = self._sql, None
+        linhas = self._linhas
+        if not linhas:
+            try:
+                linhas = max(self._cursor.rowcount, 0)
+            except Error:
+                linhas = 0
+        self._ao_concluir(sql, self._parametros, self._segundos, linhas)
+
+    def _contar(self, resultado):
+        if resultado:
+            self._linhas += len(resultado) if isinstance(resultado, list) else 1
+        return resultado
+
+    def execute(self, sql, parametros=None, *args, **kwargs):
+        self._iniciar(sql, parametros)
+        return self._medir(self._cursor.execute, sql, parametros, *args, **kwargs)
+
+    def executemany(self, sql, sequencia, *args, **kwargs):
+        self._iniciar(sql, sequencia)
+        return self._medir(self._cursor.executemany, sql, sequencia, *args, **kwargs)
+
+    def fetchone(self):
+        return self._contar(self._medir(self._cursor.fetchone))
+
+    def fetchmany(self, *args, **kwargs):
+        return self._contar(self._medir(self._cursor.fetchmany, *args, **kwargs))
+
+    def fetchall(self):
+        return self._contar(self._medir(self._cursor.fetchall))
+
+    def close(self):
+        self._concluir()
+        return self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+
+class ConexaoPooled:
+    """
+    Envolve uma conexão real do MySQL.
+    Chamar close() devolve a conexão ao pool em vez de fechá-la.
+    """
+
+    def __init__(self, pool, conexao):
+        self._pool = pool
+        self._conexao = conexao
+
+    def close(self):
+        if self._conexao is not None:
+            conexao, self._conexao = self._conexao, None
+            self._pool.devolver(conexao)
+
+    def _ativa(self):
+        if self._conexao is None:
+            raise Error("Conexão já devolvida ao pool")
+        return self._conexao
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._ativa().cursor(*args, **kwargs)
+        if self._pool.ao_medir is None and self._pool.ao_concluir is None:
+            return cursor
+        return CursorMedido(cursor, self._pool.ao_medir, self._pool.ao_concluir)
+
+    def __getattr__(self, nome):
+        return getattr(self._ativa(), nome)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PoolConexoes:
+    """
+    Pool de conexões com tamanho fixo + overflow.
+
+    - tamanho: conexões mantidas abertas entre as requisições
+    - overflow: conexões extras criadas em picos e fechadas ao devolver
+    - timeout: segundos que obter() espera por uma vaga antes de desistir
+    - validar: faz ping na conexão ociosa antes de entregá-la
+    - ao_medir: função opcional ao_medir(fase, segundos) chamada com o tempo
+      de obter() ('db_connect') e de cada execute/fetch ('db_query')
+    - ao_concluir: função opcional ao_concluir(sql, parametros, segundos, linhas)
+      chamada ao fim de cada comando executado (ver CursorMedido)
+    """
+
+    def __init__(self, config_conexao, tamanho=5, overflow=10, timeout=5.0, validar=True,
+                 ao_medir=None, ao_concluir=None):
+        self.config_conexao = dict(config_conexao)
+        self.tamanho = tamanho
+        self.overflow = overflow
+        self.timeout = timeout
+        self.validar = validar
+        self.ao_medir = ao_medir
+        self.ao_concluir = ao_concluir
+
+        self._ociosas = queue.LifoQueue()
+        self._vagas = threading.BoundedSemaphore(tamanho + overflow)
+        self._lock = threading.Lock()
+        self._stats = {
+            "criadas": 0,
+            "fechadas": 0,
+            "emprestimos": 0,
+            "em_uso": 0,
+            "invalidas": 0,
+            "timeouts": 0,
+            "espera_total_ms": 0.0,
+        }
+
+    def _contar(self, chave, valor=1):
+        with self._lock:
+            self._stats[chave] += valor
+
+    def _nova_conexao(self):
+        conexao = mysql.connector.connect(**self.config_conexao)
+        self._contar("criadas")
+        return conexao
+
+    def _fechar(self, conexao):
+        try:
+            conexao.close()
+        except Error:
+            pass
+        self._contar("fechadas")
+
+    def _valida(self, conexao):
+        try:
+            conexao.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def obter(self):
+        """Empresta uma conexão do pool (ou cria uma nova se houver vaga)"""
+        inicio = time.perf_counter()
+        if not self._vagas.acquire(timeout=self.timeout):
+            self._contar("timeouts")
+            raise PoolEsgotado(
+                f"Pool esgotado: nenhuma conexão livre em {self.timeout}s"
+            )
+
+        try:
+            conexao = None
+            while conexao is None:
+                try:
+                    candidata = self._ociosas.get_nowait()
+                except queue.Empty:
+                    conexao = self._nova_conexao()
+                    break
+                if not self.validar or self._valida(candidata):
+                    conexao = candidata
+                else:
+                    self._contar("invalidas")
+                    self._fechar(candidata)
+        except Exception:
+            self._vagas.release()
+            raise
+
+        espera_ms = (time.perf_counter() - inicio) * 1000
+        with self._lock:
+            self._stats["emprestimos"] += 1
+            self._stats["em_uso"] += 1
+            self._stats["espera_total_ms"] += espera_ms
+        if self.ao_medir is not None:
+            self.ao_medir('db_connect', espera_ms / 1000)
+        return ConexaoPooled(self, conexao)
+
+    def devolver(self, conexao):
+        """Recebe a conexão de volta; descarta se estiver quebrada ou sobrando"""
+        try:
+            # Encerra transação pendente para a próxima requisição não herdar
+            # locks nem o snapshot de leitura desta
+            if conexao.in_transaction:
+                conexao.rollback()
+            reutilizar = self._ociosas.qsize() < self.tamanho
+        except Error:
+            reutilizar = False
+
+        if reutilizar:
+            self._ociosas.put(conexao)
+        else:
+            self._fechar(conexao)
+
+        self._contar("em_uso", -1)
+        self._vagas.release()
+
+    def aquecer(self, quantidade=None):
+        """Abre conexões antecipadamente para a primeira requisição não pagar o connect"""
+        quantidade = self.tamanho if quantidade is None else min(quantidade, self.tamanho)
+        while self._ociosas.qsize() < quantidade:
+            self._ociosas.put(self._nova_conexao())
+
+    def fechar_todas(self):
+        """Fecha as conexões ociosas (usado no desligamento)"""
+        while True:
+            try:
+                self._fechar(self._ociosas.get_nowait())
+            except queue.Empty:
+                break
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["ociosas"] = self._ociosas.qsize()
+        stats["tamanho"] = self.tamanho
+        stats["overflow"] = self.overflow
+        stats["timeout"] = self.timeout
+        stats["espera_media_ms"] = round(
+            stats.pop("espera_total_ms") / stats["emprestimos"], 3
+        ) if stats["emprestimos"] else 0.0
+        return stats
@@ -0,0 +1,108 @@
+# eventos.py - FEED DE EVENTOS DOS CHAMADOS (Server-Sent Events)
+import logging
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+class FeedEventos:
+    """
+    Distribui os eventos gravados no banco para as conexões SSE do processo.
+
+    Uma única thread por processo consulta o banco (ids maiores que o último
+    visto) e guarda os eventos recentes num buffer circular; as conexões só
+    esperam na Condition e leem do buffer. N clientes acompanhando a fila
+    custam uma consulta por intervalo, não N.
+
+    - buscar(apos_id, limite): retorna [(id_evento, tipo, dados, maduro), ...]
+      em ordem de id; maduro indica que o evento já passou da janela de
+      carência (ver _consultar)
+    - ultimo_id(): maior id de evento já gravado (ponto de partida do feed)
+    - intervalo: segundos entre consultas quando ninguém chama notificar()
+    - capacidade: eventos mantidos em memória para quem reconecta
+    - limpar: função opcional chamada a cada intervalo_limpeza segundos
+      para apagar eventos antigos
+    """
+
+    LIMITE_CONSULTA = 500
+
+    def __init__(self, buscar, ultimo_id, intervalo=1.0, capacidade=1000,
+                 limpar=None, intervalo_limpeza=300):
+        self._buscar = buscar
+        self._ultimo_id = ultimo_id
+        self.intervalo = intervalo
+        self._limpar = limpar
+        self.intervalo_limpeza = intervalo_limpeza
+
+        self._eventos = deque(maxlen=capacidade)
+        self._ultimo = None
+        self._cond = threading.Condition()
+        self._acordar = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def ultimo(self):
+        """Maior id de evento já distribuído por este processo"""
+        return self._ultimo
+
+    def iniciar(self):
+        """Sobe a thread de leitura na primeira conexão (processos sem clientes não consultam)"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._ultimo = self._ultimo_id()
+                    self._thread = threading.Thread(
+                        target=self._laco, name='feed-eventos', daemon=True
+                    )
+                    self._thread.start()
+
+    def notificar(self):
+        """Pede uma consulta imediata (chamado após gravar eventos neste processo)"""
+        self._acordar.set()
+
+    def _consultar(self):
+        novos = []
+        esperado = self._ultimo + 1
+        for id_evento, tipo, dados, maduro in self._buscar(self._ultimo, self.LIMITE_CONSULTA):
+            # Um buraco na sequência pode ser uma transação que pegou o id mas
+            # ainda não fez commit: só pula o buraco depois da carência
+            if id_evento != esperado and not maduro:
+                break
+            novos.append((id_evento, tipo, dados))
+            esperado = id_evento + 1
+        if novos:
+            with self._cond:
+                self._eventos.extend(novos)
+                self._ultimo = novos[-1][0]
+                self._cond.notify_all()
+        return len(novos)
+
+    def _laco(self):
+        proxima_limpeza = time.monotonic() + self.intervalo_limpeza
+        while True:
+            self._acordar.clear()
+            try:
+                if self._consultar() >= self.LIMITE_CONSULTA:
+                    continue
+                if self._limpar is not None and time.monotonic() >= proxima_limpeza:
+                    proxima_limpeza = time.monotonic() + self.intervalo_limpeza
+                    self._limpar()
+            except Exception:
+                log.exception("Falha ao ler o feed de eventos")
+            self._acordar.wait(self.intervalo)
+
+    def aguardar(self, apos_id, timeout):
+        """
+        Eventos com id > apos_id, esperando até timeout segundos se ainda não houver.
+        Retorna None se apos_id for mais antigo que o buffer: o chamador deve ler
+        do banco os eventos até self.ultimo.
+        """
+        with self._cond:
+            if apos_id >= self._ultimo:
+                self._cond.wait(timeout)
+            if apos_id < self._ultimo and (not self._eventos or apos_id < self._eventos[0][0] - 1):
+                return None
+            return [evento for evento in self._eventos if evento[0] > apos_id]
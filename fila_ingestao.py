@@ -0,0 +1,214 @@
+# fila_ingestao.py - FILA LOCAL (SQLite) PARA GRAVAÇÃO ASSÍNCRONA DE CHAMADOS
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+log = logging.getLogger(__name__)
+
+
+class FilaIngestao:
+    """
+    Fila durável em SQLite: a requisição só grava o payload no arquivo local
+    (WAL + synchronous=FULL, sobrevive a queda do processo) e recebe um id de
+    rastreio; uma thread por processo esvazia a fila em lotes.
+
+    - caminho: arquivo SQLite (pode ser compartilhado pelos workers da máquina)
+    - gravar(itens): recebe [(id_rastreio, dados), ...] e grava tudo numa
+      transação só (group commit). Retorna {id_rastreio: (id_chamado, erro)};
+      se lançar exceção, o lote volta para a fila e é tentado de novo
+    - lote: itens por chamada de gravar
+    - intervalo: segundos entre verificações quando ninguém chama enfileirar()
+    - reserva: segundos que um lote fica reservado para um processo; se ele
+      morrer no meio, outro retoma o lote depois desse prazo
+    - retencao_horas: por quanto tempo os itens concluídos ficam consultáveis
+    - max_tentativas: lotes reservados sem sucesso até o item ir para 'erro'
+      (um item que sempre falha não trava a fila para sempre)
+    - erros_transitorios: exceções de gravar que não contam tentativa (banco
+      fora do ar, pool esgotado): o lote só espera e volta, sem nunca virar 'erro'
+    - limpar: função opcional chamada junto com a limpeza da fila (a cada
+      intervalo_limpeza segundos), para apagar o que o gravar mantém do seu lado
+    """
+
+    def __init__(self, caminho, gravar, lote=500, intervalo=0.2, reserva=60,
+                 retencao_horas=24, max_tentativas=5, erros_transitorios=(),
+                 limpar=None, intervalo_limpeza=300):
+        self.caminho = caminho
+        self._gravar = gravar
+        self.lote = lote
+        self.intervalo = intervalo
+        self.reserva = reserva
+        self.retencao_horas = retencao_horas
+        self.max_tentativas = max_tentativas
+        self.erros_transitorios = tuple(erros_transitorios)
+        self._limpar_externo = limpar
+        self.intervalo_limpeza = intervalo_limpeza
+
+        self._local = threading.local()
+        self._acordar = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._criar_tabela()
+
+    def _conexao(self):
+        """Uma conexão SQLite por thread (o módulo sqlite3 não compartilha entre threads)"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=FULL")
+            self._local.conexao = conexao
+        return conexao
+
+    def _criar_tabela(self):
+        # Conexão descartável: nenhum SQLite aberto fica para ser herdado por um fork
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS fila (
+                    id_rastreio TEXT PRIMARY KEY,
+                    dados TEXT NOT NULL,
+                    estado TEXT NOT NULL DEFAULT 'pendente',
+                    reservado_ate REAL,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    id_chamado INTEGER,
+                    erro TEXT,
+                    criado_em REAL NOT NULL
+                )
+            """)
+            conexao.execute("CREATE INDEX IF NOT EXISTS idx_fila_estado ON fila (estado, criado_em)")
+            conexao.commit()
+        finally:
+            conexao.close()
+
+    def iniciar(self):
+        """Sobe a thread que esvazia a fila (também retoma o que sobrou de execuções anteriores)"""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._laco, name='fila-ingestao', daemon=True
+                    )
+                    self._thread.start()
+
+    def enfileirar(self, dados):
+        """Grava o item na fila e retorna o id de rastreio"""
+        id_rastreio = uuid.uuid4().hex
+        self._conexao().execute(
+            "INSERT INTO fila (id_rastreio, dados, criado_em) VALUES (?, ?, ?)",
+            (id_rastreio, json.dumps(dados), time.time())
+        )
+        self.iniciar()
+        self._acordar.set()
+        return id_rastreio
+
+    def consultar(self, id_rastreio):
+        """Estado de um item: {'estado', 'id_chamado', 'erro'} ou None se não estiver na fila"""
+        linha = self._conexao().execute(
+            "SELECT estado, id_chamado, erro FROM fila WHERE id_rastreio = ?", (id_rastreio,)
+        ).fetchone()
+        if linha is None:
+            return None
+        estado, id_chamado, erro = linha
+        # Reservado para gravação continua pendente do ponto de vista do cliente
+        return {
+            "estado": 'pendente' if estado == 'processando' else estado,
+            "id_chamado": id_chamado,
+            "erro": erro,
+        }
+
+    def estatisticas(self):
+        contagens = dict(self._conexao().execute(
+            "SELECT estado, COUNT(*) FROM fila GROUP BY estado"
+        ).fetchall())
+        return {estado: contagens.get(estado, 0)
+                for estado in ('pendente', 'processando', 'gravado', 'erro')}
+
+    def _reservar(self):
+        """Reserva o próximo lote (pendentes ou reservas vencidas) para este processo"""
+        conexao = self._conexao()
+        agora = time.time()
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            # Esgotou as tentativas: sai da fila como erro em vez de voltar sempre
+            conexao.execute(
+                """UPDATE fila SET estado = 'erro', reservado_ate = NULL,
+                   erro = 'Não foi possível gravar após ' || tentativas || ' tentativas'
+                   WHERE tentativas >= ?
+                   AND (estado = 'pendente' OR (estado = 'processando' AND reservado_ate < ?))""",
+                (self.max_tentativas, agora)
+            )
+            itens = conexao.execute(
+                """SELECT id_rastreio, dados FROM fila
+                   WHERE estado = 'pendente' OR (estado = 'processando' AND reservado_ate < ?)
+                   ORDER BY criado_em LIMIT ?""",
+                (agora, self.lote)
+            ).fetchall()
+            conexao.executemany(
+                """UPDATE fila SET estado = 'processando', reservado_ate = ?,
+                   tentativas = tentativas + 1 WHERE id_rastreio = ?""",
+                [(agora + self.reserva, id_rastreio) for id_rastreio, _ in itens]
+            )
+            conexao.execute("COMMIT")
+        except Exception:
+            conexao.execute("ROLLBACK")
+            raise
+        return [(id_rastreio, json.loads(dados)) for id_rastreio, dados in itens]
+
+    def _concluir(self, resultados):
+        self._conexao().executemany(
+            """UPDATE fila SET estado = ?, id_chamado = ?, erro = ?, reservado_ate = NULL
+               WHERE id_rastreio = ?""",
+            [('erro' if erro else 'gravado', id_chamado, erro, id_rastreio)
+             for id_rastreio, (id_chamado, erro) in resultados.items()]
+        )
+
+    def _devolver(self, itens, contar=True):
+        """Volta o lote para pendente; com contar=False a reserva não gasta tentativa"""
+        self._conexao().executemany(
+            """UPDATE fila SET estado = 'pendente', reservado_ate = NULL,
+               tentativas = tentativas - ? WHERE id_rastreio = ?""",
+            [(0 if contar else 1, id_rastreio) for id_rastreio, _ in itens]
+        )
+
+    def _limpar(self):
+        self._conexao().execute(
+            "DELETE FROM fila WHERE estado IN ('gravado', 'erro') AND criado_em < ?",
+            (time.time() - self.retencao_horas * 3600,)
+        )
+        if self._limpar_externo is not None:
+            self._limpar_externo()
+
+    def _laco(self):
+        proxima_limpeza = time.monotonic() + self.intervalo_limpeza
+        espera = self.intervalo
+        while True:
+            self._acordar.clear()
+            itens = []
+            try:
+                itens = self._reservar()
+                if itens:
+                    self._concluir(self._gravar(itens))
+                    espera = self.intervalo
+                    if len(itens) >= self.lote:
+                        continue
+                if time.monotonic() >= proxima_limpeza:
+                    proxima_limpeza = time.monotonic() + self.intervalo_limpeza
+                    self._limpar()
+            except Exception as e:
+                log.exception("Falha ao gravar lote da fila de ingestão")
+                if itens:
+                    try:
+                        self._devolver(itens, contar=not isinstance(e, self.erros_transitorios))
+                    except sqlite3.Error:
+                        pass  # a reserva vence sozinha
+                # Banco fora do ar: espaça as tentativas (até 30s)
+                espera = min(espera * 2, 30)
+                time.sleep(espera)
+                continue
+            # enfileirar() acorda a thread; o que chega durante uma gravação
+            # se acumula e sai junto no próximo lote
+            self._acordar.wait(self.intervalo)
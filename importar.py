@@ -0,0 +1,264 @@
+# importar.py - IMPORTAÇÃO EM MASSA (CSV / NDJSON)
+#
+# Uso:
+#   python importar.py setores  setores.csv
+#   python importar.py usuarios usuarios.ndjson
+#   python importar.py chamados chamados.csv --lote 2000 --rejeitados rejeitados.txt
+#
+# Colunas aceitas:
+#   setores  -> nome
+#   usuarios -> nome, email, setor (nome) ou setor_id
+#   chamados -> titulo, descricao, prioridade, status (opcional),
+#               data_abertura (opcional, ISO), usuario_email ou usuario_id,
+#               setor (nome) ou setor_id
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+
+from mysql.connector import DataError, Error, IntegrityError
+
+from app import (DESCRICAO_MAX_BYTES, PRIORIDADES_VALIDAS, STATUS_VALIDOS, TITULO_MAX,
+                 get_db_connection, init_db, reconstruir_estatisticas)
+
+# setor.nome, usuario.nome e usuario.email são VARCHAR(100)
+NOME_MAX = 100
+
+SQL_INSERT = {
+    'setores': "INSERT INTO setor (nome) VALUES (%s)",
+    'usuarios': "INSERT INTO usuario (nome, email, setor_id) VALUES (%s, %s, %s)",
+    'chamados': """
+        INSERT INTO chamados
+        (titulo, descricao, prioridade, status, data_abertura, usuario_id, setor_id)
+        VALUES (%s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP), %s, %s)
+    """,
+}
+
+
+def ler_registros(caminho):
+    """
+    Lê o arquivo linha a linha (nunca carrega tudo na memória).
+    Gera (numero_da_linha, registro); registro é None se a linha for ilegível.
+    """
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        if caminho.lower().endswith('.csv'):
+            leitor = csv.DictReader(arquivo)
+            for registro in leitor:
+                yield leitor.line_num, registro
+        else:
+            for numero, linha in enumerate(arquivo, 1):
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    registro = None
+                yield numero, registro if isinstance(registro, dict) else None
+
+
+def texto(registro, campo):
+    valor = registro.get(campo)
+    return str(valor).strip() if valor not in (None, '') else ''
+
+
+def verificar_tamanho(valor, campo, maximo):
+    """ValueError se o valor não couber na coluna (o banco recusaria com DataError)"""
+    if len(valor) > maximo:
+        raise ValueError(f"Campo '{campo}' passa de {maximo} caracteres")
+
+
+class Importador:
+    """Converte registros em linhas de INSERT e grava em lotes multi-linha"""
+
+    def __init__(self, entidade, conexao, tamanho_lote, saida_rejeitados):
+        self.entidade = entidade
+        self.conexao = conexao
+        self.cursor = conexao.cursor()
+        self.tamanho_lote = tamanho_lote
+        self.saida_rejeitados = saida_rejeitados
+        self.inseridos = 0
+        self.rejeitados = 0
+
+        # Mapas em memória para resolver nomes/emails sem consultar o banco por linha
+        self.cursor.execute("SELECT nome, id_setor FROM setor")
+        self.setores = {nome.lower(): id_setor for nome, id_setor in self.cursor.fetchall()}
+        self.emails = {}
+        if entidade in ('usuarios', 'chamados'):
+            self.cursor.execute("SELECT email, id_usuario FROM usuario")
+            self.emails = {email.lower(): id_usuario for email, id_usuario in self.cursor.fetchall()}
+
+    def rejeitar(self, numero, motivo):
+        self.rejeitados += 1
+        print(f"linha {numero}: {motivo}", file=self.saida_rejeitados)
+
+    def resolver_setor(self, registro):
+        if texto(registro, 'setor_id'):
+            return int(registro['setor_id'])
+        nome = texto(registro, 'setor').lower()
+        if nome not in self.setores:
+            raise ValueError(f"Setor '{registro.get('setor')}' não existe")
+        return self.setores[nome]
+
+    def preparar(self, registro):
+        """Valida o registro e devolve a tupla do INSERT (ValueError se inválido)"""
+        if self.entidade == 'setores':
+            nome = texto(registro, 'nome')
+            if not nome:
+                raise ValueError("Campo 'nome' é obrigatório")
+            verificar_tamanho(nome, 'nome', NOME_MAX)
+            if nome.lower() in self.setores:
+                raise ValueError(f"Setor '{nome}' já existe")
+            # Reserva o nome para detectar duplicados dentro do próprio arquivo
+            self.setores[nome.lower()] = None
+            return (nome,)
+
+        if self.entidade == 'usuarios':
+            nome, email = texto(registro, 'nome'), texto(registro, 'email').lower()
+            if not nome or not email:
+                raise ValueError("Campos 'nome' e 'email' são obrigatórios")
+            verificar_tamanho(nome, 'nome', NOME_MAX)
+            verificar_tamanho(email, 'email', NOME_MAX)
+            if email in self.emails:
+                raise ValueError(f"Email '{email}' já cadastrado")
+            setor_id = self.resolver_setor(registro)
+            self.emails[email] = None
+            return (nome, email, setor_id)
+
+        # chamados
+        for campo in ('titulo', 'descricao', 'prioridade'):
+            if not texto(registro, campo):
+                raise ValueError(f"Campo '{campo}' é obrigatório")
+        verificar_tamanho(texto(registro, 'titulo'), 'titulo', TITULO_MAX)
+        if len(texto(registro, 'descricao').encode('utf-8')) > DESCRICAO_MAX_BYTES:
+            raise ValueError(f"Campo 'descricao' passa de {DESCRICAO_MAX_BYTES} bytes")
+        prioridade = texto(registro, 'prioridade').lower()
+        if prioridade not in PRIORIDADES_VALIDAS:
+            raise ValueError(f"Prioridade inválida: {prioridade}")
+        status = texto(registro, 'status').lower() or 'aberto'
+        if status not in STATUS_VALIDOS:
+            raise ValueError(f"Status inválido: {status}")
+        data_abertura = None
+        if texto(registro, 'data_abertura'):
+            data_abertura = datetime.fromisoformat(texto(registro, 'data_abertura'))
+
+        if texto(registro, 'usuario_id'):
+            usuario_id = int(registro['usuario_id'])
+        else:
+            email = texto(registro, 'usuario_email').lower()
+            if self.emails.get(email) is None:
+                raise ValueError(f"Usuário '{email}' não existe")
+            usuario_id = self.emails[email]
+
+        return (
+            texto(registro, 'titulo'), texto(registro, 'descricao'), prioridade,
+            status, data_abertura, usuario_id, self.resolver_setor(registro)
+        )
+
+    def gravar(self, lote):
+        """
+        Insere o lote com um INSERT multi-linha e faz commit.
+        Se o banco recusar o lote (FK/único/valor fora da coluna), refaz linha a linha para
+        descobrir e rejeitar apenas as linhas problemáticas.
+        """
+        if not lote:
+            return
+        sql = SQL_INSERT[self.entidade]
+        try:
+            self.cursor.executemany(sql, [linha for _, linha in lote])
+            primeiro_id = self.cursor.lastrowid
+            self.conexao.commit()
+            for deslocamento, (_, linha) in enumerate(lote):
+                self.registrar_id(linha, primeiro_id + deslocamento)
+            self.inseridos += len(lote)
+        except (DataError, IntegrityError):
+            self.conexao.rollback()
+            for numero, linha in lote:
+                try:
+                    self.cursor.execute(sql, linha)
+                    self.conexao.commit()
+                    self.registrar_id(linha, self.cursor.lastrowid)
+                    self.inseridos += 1
+                except (DataError, IntegrityError) as e:
+                    self.conexao.rollback()
+                    self.rejeitar(numero, f"Recusado pelo banco: {e.msg}")
+
+    def registrar_id(self, linha, novo_id):
+        """Atualiza os mapas em memória com os ids recém-criados"""
+        if self.entidade == 'setores':
+            self.setores[linha[0].lower()] = novo_id
+        elif self.entidade == 'usuarios':
+            self.emails[linha[1]] = novo_id
+
+
+def importar(entidade, caminho, tamanho_lote, saida_rejeitados):
+    conexao = get_db_connection()
+    if not conexao:
+        print("❌ Falha na conexão com o banco")
+        return 1
+
+    importador = None
+    inicio = time.perf_counter()
+    ultimo_aviso = inicio
+    try:
+        importador = Importador(entidade, conexao, tamanho_lote, saida_rejeitados)
+        lote = []
+        for numero, registro in ler_registros(caminho):
+            if registro is None:
+                importador.rejeitar(numero, "Linha ilegível")
+                continue
+            try:
+                lote.append((numero, importador.preparar(registro)))
+            except (TypeError, ValueError) as e:
+                importador.rejeitar(numero, str(e))
+                continue
+
+            if len(lote) >= tamanho_lote:
+                importador.gravar(lote)
+                lote = []
+                agora = time.perf_counter()
+                if agora - ultimo_aviso >= 5:
+                    ultimo_aviso = agora
+                    print(f"   ... {importador.inseridos} inseridos "
+                          f"({importador.inseridos / (agora - inicio):.0f} linhas/s)")
+        importador.gravar(lote)
+
+        # A importação não passa pelas rotas, então recalcula o resumo de uma vez
+        if entidade == 'chamados' and importador.inseridos:
+            reconstruir_estatisticas(importador.cursor)
+            conexao.commit()
+    except Error as e:
+        print(f"❌ Erro no banco: {e}")
+        return 1
+    finally:
+        if importador:
+            importador.cursor.close()
+        conexao.close()
+
+    duracao = time.perf_counter() - inicio
+    print(f"✅ {importador.inseridos} {entidade} importados em {duracao:.1f}s "
+          f"({importador.inseridos / duracao if duracao else 0:.0f} linhas/s)")
+    if importador.rejeitados:
+        print(f"⚠️  {importador.rejeitados} linhas rejeitadas")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa setores, usuários ou chamados em massa")
+    parser.add_argument('entidade', choices=sorted(SQL_INSERT))
+    parser.add_argument('arquivo', help="arquivo .csv (com cabeçalho) ou .ndjson/.jsonl")
+    parser.add_argument('--lote', type=int, default=1000, help="linhas por INSERT (padrão: 1000)")
+    parser.add_argument('--rejeitados', help="arquivo para as linhas rejeitadas (padrão: stderr)")
+    args = parser.parse_args()
+
+    init_db()
+
+    if args.rejeitados:
+        with open(args.rejeitados, 'w', encoding='utf-8') as saida:
+            return importar(args.entidade, args.arquivo, args.lote, saida)
+    return importar(args.entidade, args.arquivo, args.lote, sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# json_rapido.py - PROVEDOR JSON DO FLASK COM ORJSON
+import dataclasses
+import decimal
+import json
+import math
+import re
+import uuid
+from datetime import date
+
+from flask.json.provider import JSONProvider
+
+# orjson é opcional: sem ele o provedor usa o json da biblioteca padrão,
+# gerando exatamente os mesmos bytes
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Tudo que o json padrão escapa com ensure_ascii=True e o orjson não escapa
+# (inclusive o DEL, 0x7f, que é ASCII)
+_NAO_ASCII = re.compile('[^\x00-\x7e]')
+
+
+def _escapar(match):
+    codigo = ord(match.group())
+    if codigo < 0x10000:
+        return '\\u{0:04x}'.format(codigo)
+    # Fora do plano básico: par substituto, como o json padrão
+    codigo -= 0x10000
+    return '\\u{0:04x}\\u{1:04x}'.format(0xd800 | (codigo >> 10), 0xdc00 | (codigo & 0x3ff))
+
+
+def _tem_nao_finito(obj):
+    """NaN/Infinity em algum float (o orjson os grava como null, o json padrão como NaN)"""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_tem_nao_finito(valor) for valor in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_tem_nao_finito(valor) for valor in obj)
+    return False
+
+
+def _padrao(o):
+    """Tipos que nenhum dos dois codificadores conhece (mesmas regras do Flask, datas em ISO-8601)"""
+    if isinstance(o, date):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class ProvedorJSONRapido(JSONProvider):
+    """
+    Provedor JSON do Flask que serializa com orjson quando instalado.
+
+    Segue as opções do DefaultJSONProvider (ensure_ascii, sort_keys, compact)
+    e produz os mesmos bytes que o json padrão com essas opções, exceto que
+    datetime/date saem em ISO-8601 (AAAA-MM-DDTHH:MM:SS) em vez de data HTTP.
+    Sem indentação os separadores são sempre compactos (",", ":").
+    O que o orjson faria diferente vai para o json padrão: chaves que não são
+    str (a ordem do sort_keys mudaria) e NaN/Infinity (virariam null).
+    Única diferença conhecida entre os dois caminhos: floats muito grandes ou
+    muito pequenos mudam de notação (1e20 x 1e+20), com o mesmo valor.
+    """
+
+    ensure_ascii = True
+    sort_keys = True
+    compact = None
+    mimetype = 'application/json'
+
+    def _indentar(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def _stdlib(self, obj, indentar):
+        return json.dumps(
+            obj,
+            default=_padrao,
+            ensure_ascii=self.ensure_ascii,
+            sort_keys=self.sort_keys,
+            indent=2 if indentar else None,
+            separators=None if indentar else (',', ':'),
+        )
+
+    def codificar(self, obj, indentar=False):
+        """Serializa obj e retorna str (ponto único de serialização do provedor)"""
+        if orjson is None:
+            return self._stdlib(obj, indentar)
+        # Sem OPT_NON_STR_KEYS: chave int/None/etc. levanta TypeError e cai no json padrão
+        opcoes = 0
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        if indentar:
+            opcoes |= orjson.OPT_INDENT_2
+        try:
+            texto = orjson.dumps(obj, default=_padrao, option=opcoes).decode()
+        except (orjson.JSONEncodeError, TypeError):
+            # Inteiros > 64 bits e afins: o json padrão sabe lidar
+            return self._stdlib(obj, indentar)
+        # Só um null na saída pode ter sido NaN/Infinity; a varredura fica para esse caso
+        if 'null' in texto and _tem_nao_finito(obj):
+            return self._stdlib(obj, indentar)
+        if self.ensure_ascii:
+            texto = _NAO_ASCII.sub(_escapar, texto)
+        return texto
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault('default', _padrao)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return json.dumps(obj, **kwargs)
+        return self.codificar(obj)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            f"{self.codificar(obj, indentar=self._indentar())}\n", mimetype=self.mimetype
+        )
@@ -1,37 +1,175 @@
 # menu.py - CLIENTE CLI INTERATIVO
+import os
 import requests
-from time import sleep
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from time import monotonic, sleep
 
-BASE_URL = "http://127.0.0.1:5000"
+BASE_URL = os.getenv("API_URL", "http://127.0.0.1:5000")
 
-def safe_request(method, endpoint, **kwargs):
+# Timeouts (segundos) para conectar e para ler a resposta
+TIMEOUT_CONEXAO = float(os.getenv("API_TIMEOUT_CONEXAO", "3"))
+TIMEOUT_LEITURA = float(os.getenv("API_TIMEOUT_LEITURA", "10"))
+
+# Novas tentativas em falhas de rede/503 (só métodos idempotentes: GET, PUT, DELETE)
+TENTATIVAS = int(os.getenv("API_TENTATIVAS", "3"))
+BACKOFF = float(os.getenv("API_BACKOFF", "0.3"))
+
+def criar_sessao():
+    """
+    Sessão HTTP única do cliente: reaproveita a conexão TCP (keep-alive)
+    entre as chamadas e repete chamadas idempotentes com backoff exponencial.
+    """
+    sessao = requests.Session()
+    retry = Retry(
+        total=TENTATIVAS,
+        backoff_factor=BACKOFF,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["GET", "HEAD", "PUT", "DELETE", "OPTIONS"],
+        raise_on_status=False
+    )
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    # Anuncia gzip (e br, se o pacote brotli estiver instalado) para a API
+    # comprimir as listagens; o requests descomprime sozinho
+    sessao.headers.update(make_headers(accept_encoding=True))
+    return sessao
+
+sessao = criar_sessao()
+
+# Segundos em que as listas de setores/usuários são usadas sem consultar a API
+CACHE_TTL = float(os.getenv("API_CACHE_TTL", "60"))
+
+# Segundos entre as consultas ao feed de eventos (GET /chamados/eventos)
+INTERVALO_FEED = float(os.getenv("API_INTERVALO_FEED", "2"))
+
+def enviar_requisicao(method, endpoint, **kwargs):
     """
     Faz uma requisição HTTP com tratamento de erros
-    Retorna a resposta JSON ou None em caso de erro
+    Retorna o objeto Response ou None em caso de erro
     """
     url = f"{BASE_URL}{endpoint}"
+    kwargs.setdefault('timeout', (TIMEOUT_CONEXAO, TIMEOUT_LEITURA))
     
     try:
-        response = requests.request(method, url, timeout=5, **kwargs)
+        response = sessao.request(method, url, **kwargs)
         
         if response.status_code >= 400:
             print(f" Erro {response.status_code}: {response.text}")
             return None
         
-        return response.json()
+        return response
         
     except requests.exceptions.ConnectionError:
         print(" Erro: Não foi possível conectar à API.")
         print("  Verifique se o servidor Flask está rodando.")
     except requests.exceptions.Timeout:
-        print(" Erro: Tempo de resposta excedido (5 segundos).")
-    except ValueError:
-        print(" Erro: Resposta não está em formato JSON.")
+        print(f" Erro: Tempo de resposta excedido ({TIMEOUT_LEITURA:g} segundos).")
     except Exception as e:
         print(f" Erro inesperado: {e}")
     
     return None
 
+def ler_json(response):
+    """Converte a resposta em JSON, avisando se não for JSON"""
+    try:
+        return response.json()
+    except ValueError:
+        print(" Erro: Resposta não está em formato JSON.")
+        return None
+
+def safe_request(method, endpoint, **kwargs):
+    """
+    Faz uma requisição HTTP com tratamento de erros
+    Retorna a resposta JSON ou None em caso de erro
+    """
+    response = enviar_requisicao(method, endpoint, **kwargs)
+    if response is None:
+        return None
+    return ler_json(response)
+
+def paginas_chamados(params=None, endpoint="/chamados"):
+    """
+    Percorre GET /chamados (ou /chamados/busca) página a página (header X-Next-Cursor).
+    Gera tuplas (lista_de_chamados, tem_proxima_pagina).
+    """
+    params = dict(params or {})
+    while True:
+        response = enviar_requisicao("GET", endpoint, params=params)
+        if response is None:
+            return
+        pagina = ler_json(response)
+        if pagina is None:
+            return
+        
+        proximo = response.headers.get('X-Next-Cursor')
+        yield pagina, bool(proximo)
+        if not proximo:
+            return
+        params['cursor'] = proximo
+
+def buscar_chamado(chamado_id):
+    """
+    Busca um chamado pelo ID (GET /chamados/<id>), também entre os arquivados
+    (a API aceita PUT/DELETE neles). Retorna dict ou None
+    """
+    return safe_request("GET", f"/chamados/{chamado_id}", params={"arquivo": 1})
+
+class CacheReferencia:
+    """
+    Cópia local de uma lista da API (setores ou usuários), indexada pelo id.
+    Dentro do TTL não faz requisição; depois revalida com If-None-Match
+    e, se nada mudou, a API responde 304 sem reenviar a lista.
+    """
+    
+    def __init__(self, endpoint, campo_id):
+        self.endpoint = endpoint
+        self.campo_id = campo_id
+        self.itens = None
+        self.etag = None
+        self.buscado_em = None
+    
+    def obter(self, revalidar=False):
+        """Retorna {id: item} ou None se a API falhar e não houver cópia local"""
+        if (not revalidar and self.itens is not None
+                and monotonic() - self.buscado_em < CACHE_TTL):
+            return self.itens
+        
+        headers = {"If-None-Match": self.etag} if self.etag and self.itens is not None else {}
+        response = enviar_requisicao("GET", self.endpoint, headers=headers)
+        if response is None:
+            return None
+        
+        if response.status_code != 304:
+            lista = ler_json(response)
+            if lista is None:
+                return None
+            self.itens = {item[self.campo_id]: item for item in lista}
+            self.etag = response.headers.get("ETag")
+        self.buscado_em = monotonic()
+        return self.itens
+    
+    def invalidar(self):
+        """Força a próxima leitura a consultar a API (ainda com If-None-Match)"""
+        self.buscado_em = float('-inf')
+    
+    def contem(self, id_item):
+        """
+        Confere se o id existe. Se não estiver na cópia local, revalida antes de
+        negar: pode ter sido cadastrado agora por outro atendente (304 se nada mudou)
+        """
+        if self.itens is not None and id_item in self.itens:
+            return True
+        itens = self.obter(revalidar=True)
+        return itens is not None and id_item in itens
+
+cache_setores = CacheReferencia("/setor", "id_setor")
+cache_usuarios = CacheReferencia("/usuario", "id_usuario")
+
 # ==================== FUNÇÕES AUXILIARES ====================
 def print_titulo(titulo):
     """Imprime um título formatado"""
@@ -77,12 +215,13 @@ def criar_setor():
     
     resposta = safe_request("POST", "/setor", json={"nome": nome})
     if resposta:
+        cache_setores.invalidar()
         print_sucesso(f"Setor '{nome}' criado! ID: {resposta.get('id_setor')}")
 
 def listar_setores():
     print_titulo("LISTA DE SETORES")
     
-    setores = safe_request("GET", "/setor")
+    setores = cache_setores.obter(revalidar=True)
     if setores is None:
         return
     
@@ -90,7 +229,7 @@ def listar_setores():
         print("Nenhum setor cadastrado.")
         return
     
-    for s in setores:
+    for s in setores.values():
         print(f"  {s['id_setor']:3d} - {s['nome']}")
 
 # ==================== FUNÇÕES DE USUÁRIO ====================
@@ -99,12 +238,12 @@ def criar_usuario():
     
     # Listar setores primeiro
     print("Setores disponíveis:")
-    setores = safe_request("GET", "/setor")
-    if not setores or not setores:
+    setores = cache_setores.obter()
+    if not setores:
         print_erro("Nenhum setor cadastrado. Crie um setor primeiro.")
         return
     
-    for s in setores:
+    for s in setores.values():
         print(f"  {s['id_setor']} - {s['nome']}")
     
     print()
@@ -113,13 +252,7 @@ def criar_usuario():
     setor_id = input_int("ID do setor: ")
     
     # Verificar se setor existe
-    setor_existe = False
-    for s in setores:
-        if s['id_setor'] == setor_id:
-            setor_existe = True
-            break
-    
-    if not setor_existe:
+    if not cache_setores.contem(setor_id):
         print_erro(f"Setor com ID {setor_id} não existe!")
         return
     
@@ -131,12 +264,13 @@ def criar_usuario():
     
     resposta = safe_request("POST", "/usuario", json=payload)
     if resposta:
+        cache_usuarios.invalidar()
         print_sucesso(f"Usuário '{nome}' criado! ID: {resposta.get('id_usuario')}")
 
 def listar_usuarios():
     print_titulo("LISTA DE USUÁRIOS")
     
-    usuarios = safe_request("GET", "/usuario")
+    usuarios = cache_usuarios.obter(revalidar=True)
     if usuarios is None:
         return
     
@@ -144,7 +278,7 @@ def listar_usuarios():
         print("Nenhum usuário cadastrado.")
         return
     
-    for u in usuarios:
+    for u in usuarios.values():
         print(f"\n👤 ID: {u['id_usuario']}")
         print(f"   Nome: {u['nome']}")
         print(f"   Email: {u['email']}")
@@ -155,50 +289,38 @@ def criar_chamado():
     print_titulo("ABRIR NOVO CHAMADO")
     
     # Verificar se existem usuários
-    usuarios = safe_request("GET", "/usuario")
-    if not usuarios or not usuarios:
+    usuarios = cache_usuarios.obter()
+    if not usuarios:
         print_erro("Nenhum usuário cadastrado. Crie um usuário primeiro.")
         return
     
     # Verificar se existem setores
-    setores = safe_request("GET", "/setor")
-    if not setores or not setores:
+    setores = cache_setores.obter()
+    if not setores:
         print_erro("Nenhum setor cadastrado. Crie um setor primeiro.")
         return
     
     # Selecionar usuário
     print("Solicitantes:")
-    for u in usuarios:
+    for u in usuarios.values():
         print(f"  {u['id_usuario']} - {u['nome']} ({u['setor']})")
     
     usuario_id = input_int("\nID do solicitante: ")
     
     # Verificar se usuário existe
-    usuario_existe = False
-    for u in usuarios:
-        if u['id_usuario'] == usuario_id:
-            usuario_existe = True
-            break
-    
-    if not usuario_existe:
+    if not cache_usuarios.contem(usuario_id):
         print_erro(f"Usuário com ID {usuario_id} não existe!")
         return
     
     # Selecionar setor
     print("\nSetores:")
-    for s in setores:
+    for s in setores.values():
         print(f"  {s['id_setor']} - {s['nome']}")
     
     setor_id = input_int("ID do setor: ")
     
     # Verificar se setor existe
-    setor_existe = False
-    for s in setores:
-        if s['id_setor'] == setor_id:
-            setor_existe = True
-            break
-    
-    if not setor_existe:
+    if not cache_setores.contem(setor_id):
         print_erro(f"Setor com ID {setor_id} não existe!")
         return
     
@@ -207,17 +329,19 @@ def criar_chamado():
     titulo = input("Título do chamado: ").strip()
     descricao = input("Descrição: ").strip()
     
-    print("\nPrioridades: Baixa | Média | Alta")
+    print("\nPrioridades: Baixa | Média | Alta | Crítica")
     prioridade = input("Prioridade: ").strip().lower()
     
     # Validar prioridade
-    if prioridade not in ['baixa', 'media', 'média', 'alta']:
-        print_erro("Prioridade inválida! Use: baixa, média ou alta")
+    if prioridade not in ['baixa', 'media', 'média', 'alta', 'critica', 'crítica']:
+        print_erro("Prioridade inválida! Use: baixa, média, alta ou crítica")
         return
     
     # Normalizar prioridade
     if prioridade == 'média':
         prioridade = 'media'
+    elif prioridade == 'crítica':
+        prioridade = 'critica'
     
     payload = {
         "titulo": titulo,
@@ -232,45 +356,102 @@ def criar_chamado():
         print_sucesso(f"Chamado '#{resposta.get('id_chamado')}' aberto com sucesso!")
         print(f"   Status inicial: {resposta.get('status_inicial', 'aberto')}")
 
+# Emojis para status e prioridade
+STATUS_EMOJI = {
+    'aberto': '🔴',
+    'em atendimento': '🟡',
+    'concluido': '🟢',
+    'cancelado': '⚫'
+}
+
+PRIORIDADE_EMOJI = {
+    'critica': 'CRÍTICA',
+    'alta': 'ALTA',
+    'media': 'MÉDIA', 
+    'baixa': 'BAIXA'
+}
+
+def mostrar_chamado(c):
+    emoji_status = STATUS_EMOJI.get(c['status'], '⚪')
+    emoji_prioridade = PRIORIDADE_EMOJI.get(c['prioridade'], '⚪')
+    
+    # Formatar data
+    data = c['data_abertura']
+    if 'T' in data:
+        data = data.replace('T', ' ')[:19]
+    
+    print(f"\n{emoji_status} CHAMADO #{c['id_chamado']}")
+    print(f"   {c['titulo']}")
+    print(f"   {emoji_prioridade}")
+    print(f"   {c['usuario']} | 🏢 {c['setor']}")
+    print(f"   {data}")
+    print(f"   {c['descricao'][:80]}..." if len(c['descricao']) > 80 else f"   📝 {c['descricao']}")
+
+def mostrar_paginas(paginas):
+    """Exibe as páginas de chamados, perguntando antes de carregar a próxima. Retorna o total"""
+    total = 0
+    for chamados, tem_mais in paginas:
+        for c in chamados:
+            mostrar_chamado(c)
+        
+        total += len(chamados)
+        if not tem_mais or not input_sim_nao(f"\n{total} chamados exibidos. Carregar mais?"):
+            break
+    return total
+
 def listar_chamados():
     print_titulo("LISTA DE CHAMADOS")
     
-    chamados = safe_request("GET", "/chamados")
-    if chamados is None:
-        return
-    
-    if not chamados:
+    if mostrar_paginas(paginas_chamados()) == 0:
         print("Nenhum chamado registrado.")
-        return
+
+def mostrar_evento(evento):
+    dados = evento['dados']
+    tipo = evento['tipo']
+    hora = datetime.now().strftime('%H:%M:%S')
+    if tipo == 'criado':
+        emoji = STATUS_EMOJI.get(dados.get('status'), '⚪')
+        prioridade = PRIORIDADE_EMOJI.get(dados.get('prioridade'), dados.get('prioridade'))
+        print(f"[{hora}] {emoji} NOVO #{dados['id_chamado']} ({prioridade}): {dados.get('titulo')}")
+    elif tipo == 'atualizado':
+        emoji = STATUS_EMOJI.get(dados.get('status'), '⚪')
+        print(f"[{hora}] {emoji} ATUALIZADO #{dados['id_chamado']}: "
+              f"{dados.get('status')} | {dados.get('prioridade')}")
+    elif tipo == 'removido':
+        print(f"[{hora}] ❌ REMOVIDO #{dados['id_chamado']}")
+
+def acompanhar_fila():
+    print_titulo("ACOMPANHAR FILA")
+    print("Aguardando eventos... (Ctrl+C para voltar ao menu)")
     
-    # Emojis para status e prioridade
-    status_emoji = {
-        'aberto': '🔴',
-        'em atendimento': '🟡',
-        'concluido': '🟢'
-    }
+    # Polling em vez de SSE: entre uma consulta e outra o atendente não ocupa
+    # thread do servidor, então muitos podem acompanhar a fila ao mesmo tempo
+    ultimo_id = None
+    try:
+        while True:
+            params = {"desde": ultimo_id} if ultimo_id is not None else {}
+            resultado = safe_request("GET", "/chamados/eventos", params=params)
+            if resultado is None:
+                sleep(3)
+                continue
+            for evento in resultado.get('eventos', []):
+                mostrar_evento(evento)
+            # Guardado para a próxima consulta receber só o que ainda não viu
+            ultimo_id = resultado.get('ultimo_id', ultimo_id)
+            sleep(INTERVALO_FEED)
+    except KeyboardInterrupt:
+        print()
+
+def buscar_chamados():
+    print_titulo("BUSCAR CHAMADOS")
     
-    prioridade_emoji = {
-        'alta': 'ALTA',
-        'media': 'MÉDIA', 
-        'baixa': 'BAIXA'
-    }
+    termo = input("Buscar por (título/descrição): ").strip()
+    if not termo:
+        print_erro("Informe ao menos uma palavra.")
+        return
     
-    for c in chamados:
-        emoji_status = status_emoji.get(c['status'], '⚪')
-        emoji_prioridade = prioridade_emoji.get(c['prioridade'], '⚪')
-        
-        # Formatar data
-        data = c['data_abertura']
-        if 'T' in data:
-            data = data.replace('T', ' ')[:19]
-        
-        print(f"\n{emoji_status} CHAMADO #{c['id_chamado']}")
-        print(f"   {c['titulo']}")
-        print(f"   {emoji_prioridade}")
-        print(f"   {c['usuario']} | 🏢 {c['setor']}")
-        print(f"   {data}")
-        print(f"   {c['descricao'][:80]}..." if len(c['descricao']) > 80 else f"   📝 {c['descricao']}")
+    if mostrar_paginas(paginas_chamados({"q": termo}, endpoint="/chamados/busca")) == 0:
+        print("Nenhum chamado encontrado.")
 
 def atualizar_chamado():
     print_titulo("ATUALIZAR CHAMADO")
@@ -278,17 +459,7 @@ def atualizar_chamado():
     chamado_id = input_int("ID do chamado: ")
     
     # Verificar se chamado existe
-    resposta = safe_request("GET", "/chamados")
-    if not resposta:
-        return
-    
-    chamado_existe = False
-    for c in resposta:
-        if c['id_chamado'] == chamado_id:
-            chamado_existe = True
-            break
-    
-    if not chamado_existe:
+    if buscar_chamado(chamado_id) is None:
         print_erro(f"Chamado #{chamado_id} não encontrado!")
         return
     
@@ -303,10 +474,10 @@ def atualizar_chamado():
     
     if opcao in ["1", "3"]:
         print("\nStatus disponíveis:")
-        print("  aberto | em atendimento | concluido")
+        print("  aberto | em atendimento | concluido | cancelado")
         status = input("Novo status: ").strip().lower()
         
-        if status not in ['aberto', 'em atendimento', 'concluido']:
+        if status not in ['aberto', 'em atendimento', 'concluido', 'cancelado']:
             print_erro("Status inválido!")
             return
         
@@ -314,10 +485,10 @@ def atualizar_chamado():
     
     if opcao in ["2", "3"]:
         print("\nPrioridades disponíveis:")
-        print("  baixa | media | alta")
+        print("  baixa | media | alta | critica")
         prioridade = input("Nova prioridade: ").strip().lower()
         
-        if prioridade not in ['baixa', 'media', 'alta']:
+        if prioridade not in ['baixa', 'media', 'alta', 'critica']:
             print_erro("Prioridade inválida!")
             return
         
@@ -337,25 +508,17 @@ def deletar_chamado():
     chamado_id = input_int("ID do chamado: ")
     
     # Verificar se chamado existe
-    resposta = safe_request("GET", "/chamados")
-    if not resposta:
-        return
-    
-    chamado_existe = False
-    for c in resposta:
-        if c['id_chamado'] == chamado_id:
-            chamado_existe = True
-            # Mostrar informações do chamado
-            print(f"\n Título: {c['titulo']}")
-            print(f"Solicitante: {c['usuario']}")
-            print(f"Status: {c['status']}")
-            print(f"Prioridade: {c['prioridade']}")
-            break
-    
-    if not chamado_existe:
+    c = buscar_chamado(chamado_id)
+    if c is None:
         print_erro(f"Chamado #{chamado_id} não encontrado!")
         return
     
+    # Mostrar informações do chamado
+    print(f"\n Título: {c['titulo']}")
+    print(f"Solicitante: {c['usuario']}")
+    print(f"Status: {c['status']}")
+    print(f"Prioridade: {c['prioridade']}")
+    
     # Confirmação
     if not input_sim_nao("\nTem certeza que deseja deletar este chamado?"):
         print("Operação cancelada.")
@@ -379,6 +542,8 @@ def mostrar_menu():
         ("6", "Abrir chamado"),
         ("7", "Atualizar chamado"),
         ("8", "Deletar chamado"),
+        ("9", "Buscar chamados"),
+        ("10", "Acompanhar fila (tempo real)"),
         ("0", "Sair")
     ]
     
@@ -397,6 +562,10 @@ def verificar_api():
         if status == 'connected':
             print_sucesso(" API conectada com sucesso!")
             print(f"   Banco de dados: {resposta.get('config', {}).get('database', 'N/A')}")
+            # Já carrega setores e usuários em paralelo para abrir chamados sem espera
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                executor.submit(cache_setores.obter)
+                executor.submit(cache_usuarios.obter)
         else:
             print(" API online, mas banco de dados desconectado")
         sleep(1)
@@ -407,7 +576,7 @@ def verificar_api():
         print("  1. Certifique-se de que o servidor Flask está rodando")
         print("     Comando: python app.py")
         print("  2. Verifique se o MySQL está rodando")
-        print("  3. Confira se a URL está correta: http://127.0.0.1:5000")
+        print(f"  3. Confira se a URL está correta: {BASE_URL} (variável API_URL)")
         return False
 # ==================== FUNÇÃO PRINCIPAL ====================
 def main():
@@ -446,6 +615,10 @@ def main():
             atualizar_chamado()
         elif opcao == "8":
             deletar_chamado()
+        elif opcao == "9":
+            buscar_chamados()
+        elif opcao == "10":
+            acompanhar_fila()
         else:
             print_erro("Opção inválida! Tente novamente.")
         
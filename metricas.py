@@ -0,0 +1,118 @@
+# metricas.py - MÉTRICAS NO FORMATO PROMETHEUS
+import threading
+from bisect import bisect_left
+
+# Limites (segundos) dos buckets dos histogramas de latência
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Fases medidas dentro de cada handler
+FASES = ('db_connect', 'db_query', 'json')
+
+
+class Histograma:
+    """Histograma de tamanho fixo: observar() não aloca nada"""
+
+    __slots__ = ('contagens', 'soma', 'total', '_lock')
+
+    def __init__(self):
+        self.contagens = [0] * (len(BUCKETS) + 1)  # último = +Inf
+        self.soma = 0.0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def observar(self, valor):
+        indice = bisect_left(BUCKETS, valor)
+        with self._lock:
+            self.contagens[indice] += 1
+            self.soma += valor
+            self.total += 1
+
+    def linhas(self, nome, rotulos):
+        with self._lock:
+            contagens, soma, total = list(self.contagens), self.soma, self.total
+        acumulado = 0
+        for limite, contagem in zip(BUCKETS + ('+Inf',), contagens):
+            acumulado += contagem
+            yield f'{nome}_bucket{{{rotulos},le="{limite}"}} {acumulado}'
+        yield f'{nome}_sum{{{rotulos}}} {soma:.6f}'
+        yield f'{nome}_count{{{rotulos}}} {total}'
+
+
+class Contador:
+    __slots__ = ('valor', '_lock')
+
+    def __init__(self):
+        self.valor = 0
+        self._lock = threading.Lock()
+
+    def incrementar(self):
+        with self._lock:
+            self.valor += 1
+
+
+class Metricas:
+    """
+    Guarda as séries por rota. Cada série é criada uma única vez (na primeira
+    requisição daquela rota/status) e depois só tem seus números incrementados.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requisicoes = {}  # (rota, metodo, status) -> Contador
+        self._latencias = {}    # (rota, metodo) -> Histograma
+        self._fases = {}        # (rota, fase) -> Histograma
+
+    def _serie(self, tabela, chave, fabrica):
+        serie = tabela.get(chave)
+        if serie is None:
+            with self._lock:
+                serie = tabela.setdefault(chave, fabrica())
+        return serie
+
+    def registrar(self, rota, metodo, status, duracao, tempos_fase):
+        self._serie(self._requisicoes, (rota, metodo, status), Contador).incrementar()
+        self._serie(self._latencias, (rota, metodo), Histograma).observar(duracao)
+        for fase, segundos in zip(FASES, tempos_fase):
+            if segundos:
+                self._serie(self._fases, (rota, fase), Histograma).observar(segundos)
+
+    def exportar(self, extras=None):
+        """Texto no formato de exposição do Prometheus (text/plain; version=0.0.4)"""
+        # Cópia sob o lock: outra thread pode estar criando uma série nova
+        with self._lock:
+            requisicoes = sorted(self._requisicoes.items())
+            latencias = sorted(self._latencias.items())
+            fases = sorted(self._fases.items())
+
+        linhas = [
+            '# HELP servicedesk_http_requests_total Requisições atendidas por rota e status',
+            '# TYPE servicedesk_http_requests_total counter',
+        ]
+        for (rota, metodo, status), contador in requisicoes:
+            linhas.append(
+                f'servicedesk_http_requests_total{{rota="{rota}",metodo="{metodo}",status="{status}"}} {contador.valor}'
+            )
+
+        linhas += [
+            '# HELP servicedesk_http_request_duration_seconds Latência das requisições por rota',
+            '# TYPE servicedesk_http_request_duration_seconds histogram',
+        ]
+        for (rota, metodo), histograma in latencias:
+            linhas.extend(histograma.linhas(
+                'servicedesk_http_request_duration_seconds', f'rota="{rota}",metodo="{metodo}"'
+            ))
+
+        linhas += [
+            '# HELP servicedesk_handler_phase_seconds Tempo por fase do handler (db_connect, db_query, json)',
+            '# TYPE servicedesk_handler_phase_seconds histogram',
+        ]
+        for (rota, fase), histograma in fases:
+            linhas.extend(histograma.linhas(
+                'servicedesk_handler_phase_seconds', f'rota="{rota}",fase="{fase}"'
+            ))
+
+        for nome, valor in (extras or {}).items():
+            linhas.append(f'# TYPE {nome} gauge')
+            linhas.append(f'{nome} {valor}')
+
+        return '\n'.join(linhas) + '\n'
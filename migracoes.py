@@ -0,0 +1,106 @@
+# migracoes.py - MIGRAÇÕES VERSIONADAS DO BANCO
+from collections import namedtuple
+
+import mysql.connector
+from mysql.connector import Error, errorcode
+
+# Uma migração: número da versão, descrição e função aplicar(cursor)
+Migracao = namedtuple('Migracao', ['versao', 'descricao', 'aplicar'])
+
+# Nome do lock (GET_LOCK) que serializa processos migrando ao mesmo tempo
+LOCK_MIGRACOES = 'service_desk_migracoes'
+
+
+class MigracaoTimeout(Error):
+    """Outro processo segurou o lock de migração por tempo demais"""
+
+
+def versao_banco(cursor):
+    cursor.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def versao_atual(config_conexao, database):
+    """
+    Caminho rápido da inicialização: uma conexão e uma consulta.
+    Retorna a versão do schema, ou 0 se o banco ou a tabela schema_version não existirem.
+    """
+    try:
+        conexao = mysql.connector.connect(database=database, **config_conexao)
+    except Error as e:
+        if e.errno == errorcode.ER_BAD_DB_ERROR:
+            return 0
+        raise
+    try:
+        cursor = conexao.cursor()
+        try:
+            return versao_banco(cursor)
+        except Error as e:
+            if e.errno == errorcode.ER_NO_SUCH_TABLE:
+                return 0
+            raise
+        finally:
+            cursor.close()
+    finally:
+        conexao.close()
+
+
+def migrar(config_conexao, database, migracoes, timeout_lock=60, aviso=print):
+    """
+    Leva o banco até a última versão de migracoes (lista em ordem crescente).
+    Retorna (versao_antes, versao_depois).
+
+    Se o banco já está na última versão, custa só versao_atual(). Senão cria
+    o banco e a tabela schema_version se preciso, pega o lock de migração
+    (processos em paralelo esperam em vez de migrar junto), relê a versão e
+    aplica só o que falta, registrando cada migração em schema_version.
+    DDL no MySQL faz commit implícito: cada migração deve poder ser
+    reaplicada caso o processo caia no meio dela.
+    """
+    versoes = [migracao.versao for migracao in migracoes]
+    if versoes != sorted(set(versoes)):
+        raise ValueError("Migrações devem ter versões únicas e em ordem crescente")
+    alvo = versoes[-1]
+
+    versao = versao_atual(config_conexao, database)
+    if versao >= alvo:
+        return versao, versao
+
+    conexao = mysql.connector.connect(**config_conexao)
+    cursor = conexao.cursor()
+    try:
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`")
+        cursor.execute(f"USE `{database}`")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                versao INT PRIMARY KEY,
+                descricao VARCHAR(200) NOT NULL,
+                aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (LOCK_MIGRACOES, timeout_lock))
+        if not cursor.fetchone()[0]:
+            raise MigracaoTimeout(
+                f"Lock de migração ocupado por mais de {timeout_lock}s"
+            )
+        try:
+            # Quem esperou o lock encontra o trabalho já feito pelo outro processo
+            versao = versao_banco(cursor)
+            for migracao in migracoes:
+                if migracao.versao <= versao:
+                    continue
+                aviso(f"🔧 Migração {migracao.versao}: {migracao.descricao}")
+                migracao.aplicar(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_version (versao, descricao) VALUES (%s, %s)",
+                    (migracao.versao, migracao.descricao)
+                )
+                conexao.commit()
+            return versao, alvo
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_MIGRACOES,))
+            cursor.fetchone()
+    finally:
+        cursor.close()
+        conexao.close()
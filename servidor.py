@@ -0,0 +1,95 @@
+# servidor.py - SERVIDOR DE PRODUÇÃO (multi-processo)
+#
+# Uso: python servidor.py
+#
+# Sobe o app com o gunicorn: WEB_WORKERS processos (pre-fork), cada um com
+# WEB_THREADS threads e o seu próprio pool de conexões já aquecido.
+# O init_db roda uma única vez, no processo principal, antes do fork.
+# Cada worker sobe a thread de arquivamento; um lock no MySQL garante que só
+# um deles arquiva por vez. A fila de ingestão (SQLite) é compartilhada pelos
+# workers; cada um reserva os seus lotes.
+# Obs: o gunicorn só roda em Linux/Mac; no Windows use python app.py.
+from gunicorn.app.base import BaseApplication
+from mysql.connector import Error
+
+from app import (app, get_pool, init_db, iniciar_arquivamento, iniciar_fila_ingestao,
+                 iniciar_limpeza_eventos)
+
+
+def iniciar_worker(worker):
+    """
+    Logo após o fork, antes da primeira requisição: abre as conexões do pool
+    e sobe as threads de arquivamento, da limpeza de eventos e da fila de
+    ingestão (threads não sobrevivem ao fork)
+    """
+    try:
+        get_pool().aquecer()
+        worker.log.info("Pool de conexões aquecido (pid %s)", worker.pid)
+    except Error as e:
+        worker.log.warning("Não foi possível aquecer o pool: %s", e)
+    iniciar_arquivamento()
+    iniciar_limpeza_eventos()
+    iniciar_fila_ingestao()
+
+
+def verificar_admissao():
+    """
+    Avisa se o controle de admissão não conseguiria recusar nada: as vagas e as
+    filas de todas as classes precisam caber em WEB_THREADS com folga, senão as
+    requisições excedentes esperam sem limite na fila interna do gunicorn.
+    """
+    config = app.config
+    classes = [
+        (config['ADMISSAO_LEITURAS'], config['ADMISSAO_FILA']),
+        (config['ADMISSAO_ESCRITAS'], config['ADMISSAO_FILA']),
+        (config['EVENTOS_MAX_CONEXOES'], 0),
+    ]
+    if any(limite <= 0 for limite, _ in classes):
+        print("⚠️  Controle de admissão com classe sem limite (0): sem 503 rápido para ela")
+        return
+    ocupadas = sum(limite + fila for limite, fila in classes)
+    if ocupadas >= config['WEB_THREADS']:
+        print(f"⚠️  Vagas + filas de admissão ({ocupadas}) >= WEB_THREADS "
+              f"({config['WEB_THREADS']}): o 503 rápido nunca vai acontecer. "
+              f"Aumente WEB_THREADS ou reduza ADMISSAO_*/EVENTOS_MAX_CONEXOES")
+
+
+def fechar_pool(server, worker):
+    """Fecha as conexões ociosas quando o worker termina"""
+    get_pool().fechar_todas()
+
+
+class ServidorServiceDesk(BaseApplication):
+    def __init__(self, opcoes):
+        self.opcoes = opcoes
+        super().__init__()
+
+    def load_config(self):
+        for chave, valor in self.opcoes.items():
+            self.cfg.set(chave, valor)
+
+    def load(self):
+        return app
+
+
+def main():
+    init_db()
+    verificar_admissao()
+
+    opcoes = {
+        'bind': f"{app.config['API_HOST']}:{app.config['API_PORT']}",
+        'workers': app.config['WEB_WORKERS'],
+        'threads': app.config['WEB_THREADS'],
+        'worker_class': 'gthread',
+        'graceful_timeout': app.config['WEB_GRACEFUL_TIMEOUT'],
+        'post_worker_init': iniciar_worker,
+        'worker_exit': fechar_pool,
+    }
+    print(f"🚀 Servidor de produção em: http://{opcoes['bind']} "
+          f"({opcoes['workers']} processos x {opcoes['threads']} threads)")
+    print(f"📊 Banco de dados: {app.config['MYSQL_DB']}")
+    ServidorServiceDesk(opcoes).run()
+
+
+if __name__ == '__main__':
+    main()